@@ -0,0 +1,128 @@
+"""
+Optional downscale/transcode stage between the image store and the Slack upload.
+
+Full-resolution photos are resized so their longest side is at most IMAGE_MAX_DIMENSION and
+re-encoded as IMAGE_OUTPUT_FORMAT at IMAGE_QUALITY. The work runs in a process pool so it
+never blocks the worker's event loop. The pool uses the spawn start method, since forking a
+process that already runs an event loop and client threads can deadlock the child.
+Images under IMAGE_DOWNSCALE_MIN_BYTES are sent as-is, and so is everything when the stage
+is disabled or Pillow isn't installed (the worker warns about the latter at startup).
+A re-encode that comes out larger than the original is discarded.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple, Union
+
+from dotenv import load_dotenv
+from temporalio import activity
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it images pass through unchanged
+    Image = None
+    ImageOps = None
+
+load_dotenv()
+
+IMAGE_DOWNSCALE_ENABLED = os.getenv("IMAGE_DOWNSCALE_ENABLED", "").lower() in ("1", "true", "yes")
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "2048"))
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+IMAGE_OUTPUT_FORMAT = os.getenv("IMAGE_OUTPUT_FORMAT", "JPEG").upper()
+IMAGE_DOWNSCALE_MIN_BYTES = int(os.getenv("IMAGE_DOWNSCALE_MIN_BYTES", str(512 * 1024)))
+IMAGE_PIPELINE_WORKERS = int(os.getenv("IMAGE_PIPELINE_WORKERS", "2"))
+
+_EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp", "PNG": "png"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+_stats: Dict[str, int] = {
+    "processed": 0,
+    "skipped": 0,
+    "failed": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+}
+
+
+def _transcode(data: bytes, max_dimension: int, output_format: str, quality: int) -> bytes:
+    """Resize and re-encode one image. Runs in a pool process."""
+    with Image.open(io.BytesIO(data)) as image:
+        # Apply the EXIF orientation before the tag is dropped by re-encoding
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension))
+        if output_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format=output_format, quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the process pool shared by every image upload in this worker."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_PIPELINE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def missing_dependency() -> bool:
+    """True when the stage is enabled but Pillow isn't installed, so images would pass through unchanged."""
+    return IMAGE_DOWNSCALE_ENABLED and Image is None
+
+
+def shutdown_executor() -> None:
+    """Stop the process pool if it was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def stats() -> Dict[str, int]:
+    """Return how many images were processed or skipped and the bytes saved overall."""
+    return {**_stats, "bytes_saved": _stats["bytes_in"] - _stats["bytes_out"]}
+
+
+async def prepare_for_upload(
+    data: Union[bytes, memoryview], filename: str
+) -> Tuple[Union[bytes, memoryview], str]:
+    """Downscale an image before upload. Returns the data to upload and its filename."""
+    size = memoryview(data).nbytes
+    if not IMAGE_DOWNSCALE_ENABLED or Image is None or size < IMAGE_DOWNSCALE_MIN_BYTES:
+        _stats["skipped"] += 1
+        return data, filename
+
+    try:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            get_executor(),
+            _transcode,
+            bytes(data),
+            IMAGE_MAX_DIMENSION,
+            IMAGE_OUTPUT_FORMAT,
+            IMAGE_QUALITY,
+        )
+    except Exception as e:
+        _stats["failed"] += 1
+        activity.logger.warning(f"Image downscale failed, uploading the original: {e}")
+        return data, filename
+
+    if len(result) >= size:
+        _stats["skipped"] += 1
+        activity.logger.info(f"Downscaled image was not smaller ({len(result)} >= {size} bytes), uploading the original")
+        return data, filename
+
+    _stats["processed"] += 1
+    _stats["bytes_in"] += size
+    _stats["bytes_out"] += len(result)
+    activity.logger.info(f"Downscaled image from {size} to {len(result)} bytes, saved {size - len(result)} bytes")
+
+    stem = filename.rsplit(".", 1)[0]
+    return result, f"{stem}.{_EXTENSIONS.get(IMAGE_OUTPUT_FORMAT, IMAGE_OUTPUT_FORMAT.lower())}"
@@ -1,40 +1,276 @@
 """
-In-memory image store to avoid passing large base64 payloads through Temporal workflow history.
+In-memory image store to avoid passing large image payloads through Temporal workflow history.
 
 Activities store image data here and pass only a lightweight key through the workflow.
-Since all activities run in the same worker process, they share this store.
+With the default in-process backend every activity has to run in the same worker process.
+Setting IMAGE_STORE_BACKEND=disk also writes each image to a content-addressed directory
+(IMAGE_STORE_DIR, on a volume shared by the workers), so keys resolve on any worker replica
+and survive restarts. The in-memory copy stays the fast path in both modes.
+
+Disk writes and reads run in a worker thread, and expired files are swept by a background
+task, so the shared directory never blocks the event loop the activities run on.
+
+Images are kept as raw bytes: producers hand over the buffer they downloaded into (no
+base64 encoding, no extra copy) and consumers get a read-only memoryview over it.
+
+The store is bounded by IMAGE_STORE_MAX_BYTES. When a new image doesn't fit, the least
+recently stored images are evicted; images older than IMAGE_STORE_TTL_SECONDS expire through
+a heap ordered by deadline, so neither put nor get scans the whole store. Taking out a key that
+was evicted or expired raises ImageEvictedError, so the consumer can fetch the media again
+instead of silently sending the message without its image.
 """
 
-import uuid
+import asyncio
+import hashlib
+import heapq
+import mmap
+import os
+import tempfile
 import time
-from typing import Optional
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ImageData = Union[bytes, bytearray, memoryview]
+
+MAX_BYTES = int(os.getenv("IMAGE_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+TTL_SECONDS = int(os.getenv("IMAGE_STORE_TTL_SECONDS", str(30 * 60)))  # 30 minutes
+
+IMAGE_STORE_BACKEND = os.getenv("IMAGE_STORE_BACKEND", "memory").lower()
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "media_store")
+# Minimum seconds between two sweeps of the directory for expired files
+GC_INTERVAL_SECONDS = int(os.getenv("IMAGE_STORE_GC_INTERVAL_SECONDS", "60"))
+
+# How many evicted/expired keys are remembered so a late get() can report them
+LOST_KEYS_REMEMBERED = 4096
+
+# ApplicationError type consumer activities raise when their image is gone
+IMAGE_EVICTED_ERROR = "ImageEvictedError"
+
+
+class ImageEvictedError(LookupError):
+    """Raised by get() for a key whose image was evicted or expired before it was used."""
+
+    def __init__(self, key: str, reason: str) -> None:
+        super().__init__(f"Image {key} was {reason} before it was used")
+        self.key = key
+        self.reason = reason
+
+
+class DiskBackend:
+    """Content-addressed image files in a directory shared by every worker.
+
+    A file is named after the SHA-256 of its content, so the same image stored twice is written
+    once. Writes go to a temporary file that is renamed into place, so a reader on another
+    worker never sees a partial image. Files older than the TTL are removed by gc().
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._last_gc = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        """Return the file path for a key, sharded by its first two hex digits."""
+        return os.path.join(self.directory, key[:2], key)
+
+    def write(self, key: str, data: ImageData) -> None:
+        """Atomically write an image under its key, or refresh its age if it is already there."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+            return
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def read(self, key: str) -> Optional[memoryview]:
+        """Map an image file read-only and return a view over it, or None if it is gone."""
+        try:
+            with open(self._path(key), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return memoryview(b"")
+                # The mapping stays valid after the file is closed (or even removed by gc)
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except FileNotFoundError:
+            return None
+
+    def gc_due(self) -> bool:
+        """Return True if the GC interval has passed since the last sweep."""
+        return time.time() - self._last_gc >= GC_INTERVAL_SECONDS
+
+    def gc(self) -> int:
+        """Remove files older than the TTL, at most once per GC interval. Returns the number removed."""
+        if not self.gc_due():
+            return 0
+        now = self._last_gc = time.time()
 
-_store: dict[str, dict] = {}
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.directory):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    if now - os.stat(path).st_mtime > self.ttl_seconds:
+                        os.unlink(path)
+                        removed += 1
+                except FileNotFoundError:
+                    # Another worker removed it first
+                    pass
+        return removed
 
-TTL_SECONDS = 30 * 60  # 30 minutes
 
+_backend: Optional[DiskBackend] = None
+# The directory sweep currently running in the background, if any
+_gc_task: Optional["asyncio.Task[None]"] = None
 
-def put(image_data: str) -> str:
-    """Store base64 image data and return a key."""
-    _cleanup()
-    key = str(uuid.uuid4())
-    _store[key] = {"data": image_data, "ts": time.time()}
+
+def get_backend() -> Optional[DiskBackend]:
+    """Return the shared disk backend, or None when images are only kept in memory."""
+    global _backend
+    if IMAGE_STORE_BACKEND != "disk":
+        return None
+    if _backend is None:
+        _backend = DiskBackend(IMAGE_STORE_DIR, TTL_SECONDS)
+    return _backend
+
+
+# key -> (data, size, expires_at), oldest first
+_store: "OrderedDict[str, Tuple[ImageData, int, float]]" = OrderedDict()
+# (expires_at, key) for every stored key; entries for keys already gone are skipped lazily
+_deadlines: List[Tuple[float, str]] = []
+# key -> "evicted" / "expired", oldest first
+_lost: "OrderedDict[str, str]" = OrderedDict()
+
+_stats: Dict[str, int] = {
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+    "expirations": 0,
+    "bytes_held": 0,
+    "disk_reads": 0,
+    "disk_expirations": 0,
+}
+
+
+def start_gc(backend: DiskBackend) -> None:
+    """Sweep the shared directory for expired files in a background thread, one sweep at a time."""
+    global _gc_task
+    if (_gc_task is not None and not _gc_task.done()) or not backend.gc_due():
+        return
+    _gc_task = asyncio.create_task(_gc(backend))
+
+
+async def _gc(backend: DiskBackend) -> None:
+    """Run one directory sweep off the event loop and count the files it removed."""
+    try:
+        _stats["disk_expirations"] += await asyncio.to_thread(backend.gc)
+    except OSError:
+        # The directory is unavailable right now; the next put() after the interval tries again
+        pass
+
+
+async def put(image_data: ImageData) -> str:
+    """Store raw image bytes and return a key. The buffer is kept as-is, not copied.
+
+    With the disk backend the key is the SHA-256 of the image and the image is also written
+    to the shared directory; otherwise the key is a random UUID.
+    """
+    now = time.monotonic()
+    _expire(now)
+
+    backend = get_backend()
+    if backend is not None:
+        key = hashlib.sha256(image_data).hexdigest()
+        await asyncio.to_thread(backend.write, key, image_data)
+        start_gc(backend)
+        if key in _store:
+            # Same image stored again: one in-memory copy is enough, the file serves the rest
+            return key
+    else:
+        key = str(uuid.uuid4())
+
+    size = memoryview(image_data).nbytes
+    # Make room under the byte budget; a single image larger than the budget is still kept
+    while _store and _stats["bytes_held"] + size > MAX_BYTES:
+        oldest = next(iter(_store))
+        _drop(oldest, "evicted")
+        _stats["evictions"] += 1
+
+    expires_at = now + TTL_SECONDS
+    _store[key] = (image_data, size, expires_at)
+    heapq.heappush(_deadlines, (expires_at, key))
+    _stats["bytes_held"] += size
     return key
 
 
-def get(key: Optional[str]) -> Optional[str]:
-    """Retrieve and delete base64 image data by key. Returns None if missing/expired."""
-    if not key or key not in _store:
+async def get(key: Optional[str]) -> Optional[memoryview]:
+    """Retrieve and delete image bytes by key as a read-only view.
+
+    Returns None for a missing or unknown key and raises ImageEvictedError if the image was
+    evicted or expired before this call. With the disk backend a key not held in memory (stored
+    by another worker, or before a restart) is read from the shared directory, and the file is
+    left for other readers until it expires.
+    """
+    if not key:
         return None
-    entry = _store.pop(key)
-    if time.time() - entry["ts"] > TTL_SECONDS:
+    _expire(time.monotonic())
+
+    entry = _store.pop(key, None)
+    backend = get_backend()
+    if entry is None and backend is not None:
+        data = await asyncio.to_thread(backend.read, key)
+        if data is not None:
+            _stats["disk_reads"] += 1
+            _stats["hits"] += 1
+            return data
+        _lost.pop(key, None)
+        _stats["misses"] += 1
+        raise ImageEvictedError(key, "expired")
+
+    if entry is None:
+        _stats["misses"] += 1
+        reason = _lost.pop(key, None)
+        if reason:
+            raise ImageEvictedError(key, reason)
         return None
-    return entry["data"]
+
+    data, size, _ = entry
+    _stats["bytes_held"] -= size
+    _stats["hits"] += 1
+    return memoryview(data).toreadonly()
+
+
+def stats() -> Dict[str, int]:
+    """Return hit/miss/eviction/expiration counters plus the bytes and images currently held."""
+    return {**_stats, "entries": len(_store)}
+
+
+def _expire(now: float) -> None:
+    """Drop every image whose deadline has passed."""
+    while _deadlines and _deadlines[0][0] <= now:
+        _, key = heapq.heappop(_deadlines)
+        if key in _store and _store[key][2] <= now:
+            _drop(key, "expired")
+            _stats["expirations"] += 1
 
 
-def _cleanup():
-    """Remove expired entries."""
-    now = time.time()
-    expired = [k for k, v in _store.items() if now - v["ts"] > TTL_SECONDS]
-    for k in expired:
-        del _store[k]
+def _drop(key: str, reason: str) -> None:
+    """Remove a stored image and remember why, so a later get() can report it."""
+    _, size, _ = _store.pop(key)
+    _stats["bytes_held"] -= size
+    _lost[key] = reason
+    if len(_lost) > LOST_KEYS_REMEMBERED:
+        _lost.popitem(last=False)
@@ -1,14 +1,12 @@
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
-from typing import List
+from typing import Any, Dict, List, Optional
 from temporalio import activity
-import os
 
 from dotenv import load_dotenv
+from activities.slack_client import get_client as get_slack_client
+from activities.slack_approval_activities.get_reactions import extract_message_text, first_image_url
 load_dotenv()
 
-client = WebClient(token=os.getenv("SLACK_TOKEN"))
-
 @activity.defn
 async def get_messages(channel_id: str, limit: int = 15) -> List[str]:
     """
@@ -25,7 +23,8 @@ async def get_messages(channel_id: str, limit: int = 15) -> List[str]:
     try:
         # Fetch conversation history from Slack
         # Note: Slack API returns messages in reverse chronological order (newest first)
-        res = client.conversations_history(
+        client = await get_slack_client()
+        res = await client.conversations_history(
             channel=channel_id,
             limit=limit
         )
@@ -54,3 +53,63 @@ async def get_messages(channel_id: str, limit: int = 15) -> List[str]:
     except Exception as e:
         activity.logger.error(f"Unexpected error fetching messages: {str(e)}")
         raise
+
+
+@activity.defn
+async def get_recent_messages(channel_id: str, limit: int = 15, ts: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Fetches the last few messages from a Slack channel with their text, user, reactions and
+    first image, using a single conversations_history call.
+
+    Args:
+        channel_id: The Slack channel ID to fetch messages from
+        limit: Maximum number of messages to fetch (default: 15)
+        ts: If given, fetch only the message with this timestamp
+
+    Returns:
+        List of message dicts ordered from oldest to newest. Images are not downloaded here;
+        `image_url` is only fetched once the workflow finds an approval reaction.
+    """
+    try:
+        # conversations_history already includes reactions and files for every message
+        client = await get_slack_client()
+        if ts:
+            res = await client.conversations_history(
+                channel=channel_id,
+                latest=ts,
+                oldest=ts,
+                inclusive=True,
+                limit=1,
+            )
+        else:
+            res = await client.conversations_history(
+                channel=channel_id,
+                limit=limit
+            )
+
+        messages = res.get("messages", [])
+        activity.logger.info(f"Fetched {len(messages)} messages from channel {channel_id}")
+
+        results = []
+        for msg in messages:
+            if "ts" not in msg:
+                continue
+            has_image, image_url = first_image_url(msg)
+            results.append({
+                "ts": msg["ts"],
+                "text": extract_message_text(msg),
+                "user": msg.get("user", None),
+                "reactions": msg.get("reactions", []),
+                "has_image": has_image,
+                "image_url": image_url,
+            })
+
+        # Slack returns newest first; process from old to new
+        return list(reversed(results))
+
+    except SlackApiError as e:
+        activity.logger.error(f"Slack API error: {e.response['error']}")
+        raise
+    except Exception as e:
+        activity.logger.error(f"Unexpected error fetching messages: {str(e)}")
+        raise
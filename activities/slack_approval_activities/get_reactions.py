@@ -1,24 +1,93 @@
-from slack_sdk import WebClient
 from temporalio import activity
+from typing import Optional
 import os
-import base64
-import urllib.request
 
 from dotenv import load_dotenv
 from activities.image_store import put as image_store_put
+from activities.slack_client import get_client as get_slack_client, get_session as get_slack_session
 load_dotenv()
 
 SLACK_TOKEN = os.getenv("SLACK_TOKEN")
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN") or SLACK_TOKEN
 
-client = WebClient(token=SLACK_TOKEN)
+# Images larger than this are skipped rather than buffered into the image store
+SLACK_IMAGE_MAX_BYTES = int(os.getenv("SLACK_IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+
+def extract_message_text(message: dict) -> str:
+    """Extract text from a Slack message, handling both plain text and Block Kit messages."""
+    message_text = message.get("text", "")
+
+    # If text is empty or looks like a fallback, try to extract from blocks
+    if not message_text or message_text.startswith("New message from"):
+        blocks = message.get("blocks", [])
+        for block in blocks:
+            if block.get("type") == "section":
+                text_obj = block.get("text", {})
+                if text_obj.get("type") in ["mrkdwn", "plain_text"]:
+                    extracted_text = text_obj.get("text", "")
+                    if extracted_text and not extracted_text.startswith("New message from"):
+                        message_text = extracted_text
+                        break
+
+    return message_text
+
+
+def first_image_url(message: dict) -> tuple:
+    """Return (has_image, download URL) for the first image file attached to a Slack message."""
+    for file in message.get("files", []):
+        # Check if it's an image
+        if file.get("mimetype", "").startswith("image/"):
+            return True, file.get("url_private_download") or file.get("url_private")
+    return False, None
+
+
+def has_approval(message: dict) -> bool:
+    """Return True if the message carries a white_check_mark reaction."""
+    return any(r.get("name") == "white_check_mark" for r in message.get("reactions", []))
+
+
+async def download_image(image_url: str, ts: str) -> Optional[str]:
+    """Stream a Slack-hosted image into the image store and return its key, or None on failure.
+
+    The body is read in chunks and the download is abandoned as soon as it exceeds
+    SLACK_IMAGE_MAX_BYTES, so an oversized file never gets fully buffered.
+    """
+    try:
+        session = await get_slack_session()
+        async with session.get(
+            image_url,
+            headers={"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Image download failed with status: {response.status}")
+            # Slack answers with its HTML login page instead of an error when the token can't read the file
+            if response.content_type == "text/html":
+                raise RuntimeError("Got an HTML page instead of the image, check the bot token scopes")
+            if response.content_length and response.content_length > SLACK_IMAGE_MAX_BYTES:
+                raise RuntimeError(f"Image is {response.content_length} bytes, over the {SLACK_IMAGE_MAX_BYTES} byte limit")
+
+            image_bytes = bytearray()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                image_bytes.extend(chunk)
+                if len(image_bytes) > SLACK_IMAGE_MAX_BYTES:
+                    raise RuntimeError(f"Image exceeded the {SLACK_IMAGE_MAX_BYTES} byte limit")
+
+        image_key = await image_store_put(image_bytes)
+        activity.logger.info(f"Downloaded image from message {ts} ({len(image_bytes)} bytes)")
+        return image_key
+    except Exception as e:
+        activity.logger.error(f"Failed to download image: {e}")
+        return None
+
 
 @activity.defn
 async def check_reactions(info):
     """Fetch reactions and image data for a Slack message by timestamp."""
     ts, channel_id = info[0], info[1]
 
-    msg_res = client.conversations_history(
+    client = await get_slack_client()
+
+    msg_res = await client.conversations_history(
         channel=channel_id,
         latest=ts,
         oldest=ts,
@@ -32,7 +101,7 @@ async def check_reactions(info):
     # Get the full message from conversations_history (includes files)
     full_message = msg_res["messages"][0]
 
-    react_res = client.reactions_get(
+    react_res = await client.reactions_get(
         channel=channel_id,
         timestamp=ts,
     )
@@ -43,48 +112,14 @@ async def check_reactions(info):
     if "files" not in msg_with_reactions and "files" in full_message:
         msg_with_reactions["files"] = full_message["files"]
 
-    # Extract text - handle both plain text and Block Kit messages
-    message_text = msg_with_reactions.get("text", "")
+    message_text = extract_message_text(msg_with_reactions)
 
-    # If text is empty or looks like a fallback, try to extract from blocks
-    if not message_text or message_text.startswith("New message from"):
-        blocks = msg_with_reactions.get("blocks", [])
-        for block in blocks:
-            if block.get("type") == "section":
-                text_obj = block.get("text", {})
-                if text_obj.get("type") in ["mrkdwn", "plain_text"]:
-                    extracted_text = text_obj.get("text", "")
-                    if extracted_text and not extracted_text.startswith("New message from"):
-                        message_text = extracted_text
-                        break
-
-    # Check for files/images in the message
-    files = msg_with_reactions.get("files", [])
-    has_image = False
+    # Check for files/images in the message (only the first image is handled). The image is
+    # only downloaded once the message is approved, so re-checking pending messages is free.
+    has_image, image_url = first_image_url(msg_with_reactions)
     image_data = None
-
-    if files:
-        for file in files:
-            # Check if it's an image
-            if file.get("mimetype", "").startswith("image/"):
-                has_image = True
-                image_url = file.get("url_private_download") or file.get("url_private")
-
-                # Download the image if we have a URL
-                if image_url:
-                    try:
-                        req = urllib.request.Request(
-                            image_url,
-                            headers={"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-                        )
-                        with urllib.request.urlopen(req) as response:
-                            image_bytes = response.read()
-                            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                            image_data = image_store_put(image_base64)
-                            activity.logger.info(f"Downloaded image from message {ts}")
-                    except Exception as e:
-                        activity.logger.error(f"Failed to download image: {e}")
-                break  # Only handle the first image
+    if image_url and has_approval(msg_with_reactions):
+        image_data = await download_image(image_url, ts)
 
     return {
         "ts": ts,
@@ -94,3 +129,10 @@ async def check_reactions(info):
         "has_image": has_image,
         "image_data": image_data,
     }
+
+
+@activity.defn
+async def download_slack_image(info):
+    """Download the image of an approved Slack message into the image store and return its key."""
+    image_url, ts = info[0], info[1]
+    return await download_image(image_url, ts)
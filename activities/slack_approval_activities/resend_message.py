@@ -1,10 +1,13 @@
 from temporalio import activity
+from temporalio.exceptions import ApplicationError
 import os
 import re
-import base64
 
 from dotenv import load_dotenv
-from activities.image_store import get as image_store_get
+from activities.image_store import IMAGE_EVICTED_ERROR, ImageEvictedError, get as image_store_get
+from activities.slack_client import get_session as get_slack_session
+from activities.image_pipeline import prepare_for_upload
+from activities.slack_upload import upload_file
 load_dotenv()
 
 SLACK_WEBHOOK_URL2 = os.getenv("SLACK_WEBHOOK_URL_NEWS")
@@ -55,8 +58,6 @@ def extract_content_only(text: str) -> str:
 @activity.defn
 async def resend_message(info):
     """Resend an approved message to the news Slack channel with optional image."""
-    import aiohttp
-
     # Handle both old format (string) and new format (dict with image data)
     if isinstance(info, str):
         message = info
@@ -66,7 +67,11 @@ async def resend_message(info):
         message = info.get("text", "")
         has_image = info.get("has_image", False)
         image_key = info.get("image_data")
-        image_data = image_store_get(image_key) if has_image else None
+        try:
+            image_data = await image_store_get(image_key) if has_image else None
+        except ImageEvictedError as e:
+            # The workflow downloads the image again and retries with the new key
+            raise ApplicationError(str(e), type=IMAGE_EVICTED_ERROR, non_retryable=True)
 
     # Extract only the content, removing metadata lines
     message = extract_content_only(message)
@@ -74,60 +79,20 @@ async def resend_message(info):
     # If there's an image and we have bot token and channel ID, use Slack files API
     if has_image and image_data and SLACK_BOT_TOKEN and SLACK_CHANNEL_ID_NEWS:
         try:
-            # Decode base64 image
-            image_bytes = base64.b64decode(image_data)
-
-            async with aiohttp.ClientSession() as session:
-                # Step 1: Get upload URL from Slack
-                upload_url_resp = await session.get(
-                    'https://slack.com/api/files.getUploadURLExternal',
-                    params={
-                        'filename': 'image.jpg',
-                        'length': len(image_bytes)
-                    },
-                    headers={'Authorization': f'Bearer {SLACK_BOT_TOKEN}'}
-                )
-                upload_url_result = await upload_url_resp.json()
-
-                if not upload_url_result.get('ok'):
-                    raise RuntimeError(f"Failed to get upload URL: {upload_url_result.get('error')}")
-
-                upload_url = upload_url_result['upload_url']
-                file_id = upload_url_result['file_id']
-
-                activity.logger.info(f"Got upload URL for file_id: {file_id}")
-
-                # Step 2: Upload the file to the provided URL
-                async with session.post(
-                    upload_url,
-                    data=image_bytes,
-                    headers={'Content-Type': 'application/octet-stream'}
-                ) as upload_resp:
-                    if upload_resp.status != 200:
-                        raise RuntimeError(f"File upload failed with status: {upload_resp.status}")
-
-                activity.logger.info(f"Uploaded file to Slack storage")
-
-                # Step 3: Complete the upload and share to channel
-                complete_resp = await session.post(
-                    'https://slack.com/api/files.completeUploadExternal',
-                    json={
-                        'files': [{'id': file_id, 'title': 'Image'}],
-                        'channel_id': SLACK_CHANNEL_ID_NEWS,
-                        'initial_comment': message
-                    },
-                    headers={
-                        'Authorization': f'Bearer {SLACK_BOT_TOKEN}',
-                        'Content-Type': 'application/json'
-                    }
-                )
-                complete_result = await complete_resp.json()
-
-                if not complete_result.get('ok'):
-                    raise RuntimeError(f"Failed to complete upload: {complete_result.get('error')}")
-
-                activity.logger.info(f"Successfully uploaded message with image to Slack")
-                return complete_result
+            image_data, filename = await prepare_for_upload(image_data, 'image.jpg')
+
+            upload = await upload_file(
+                image_data,
+                token=SLACK_BOT_TOKEN,
+                channel_id=SLACK_CHANNEL_ID_NEWS,
+                initial_comment=message,
+                filename=filename,
+                title='Image',
+            )
+            complete_result = upload['complete_result']
+
+            activity.logger.info(f"Successfully uploaded message with image to Slack")
+            return complete_result
         except Exception as e:
             activity.logger.error(f"Failed to upload image, falling back to text only: {e}")
             # Fall back to webhook if image upload fails
@@ -146,13 +111,13 @@ async def resend_message(info):
         "text": f"New message: {message[:50]}..."  # Fallback text for notifications
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            SLACK_WEBHOOK_URL2,
-            json=payload,
-            headers={"Content-type": "application/json"}
-        ) as resp:
-            if resp.status != 200:
-                body = await resp.text()
-                raise RuntimeError(f"Webhook request failed: {resp.status}, {body}")
-            return await resp.text()
+    session = await get_slack_session()
+    async with session.post(
+        SLACK_WEBHOOK_URL2,
+        json=payload,
+        headers={"Content-type": "application/json"}
+    ) as resp:
+        if resp.status != 200:
+            body = await resp.text()
+            raise RuntimeError(f"Webhook request failed: {resp.status}, {body}")
+        return await resp.text()
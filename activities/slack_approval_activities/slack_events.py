@@ -0,0 +1,136 @@
+"""
+Receiver for Slack Events API `reaction_added` events.
+
+Runs a small HTTP endpoint next to the worker. When someone adds a :white_check_mark: to a
+message, the approval workflow is signalled with the channel and ts right away, so approved
+posts reach the news channel in seconds. The workflow's regular poll stays as a slow
+reconciliation sweep for events that were missed (worker restarts, delivery failures).
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+from dotenv import load_dotenv
+from temporalio.client import Client
+from temporalio.service import RPCError
+
+load_dotenv()
+
+SLACK_EVENTS_ENABLED = os.getenv("SLACK_EVENTS_ENABLED", "").lower() in ("1", "true", "yes")
+SLACK_EVENTS_PORT = int(os.getenv("SLACK_EVENTS_PORT", "3000"))
+SLACK_EVENTS_PATH = os.getenv("SLACK_EVENTS_PATH", "/slack/events")
+SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET", "")
+SLACK_APPROVAL_WORKFLOW_ID = os.getenv("SLACK_APPROVAL_WORKFLOW_ID", "slack-monitor-1")
+
+APPROVAL_REACTION = "white_check_mark"
+APPROVE_SIGNAL = "approve"
+
+# Slack recommends rejecting requests whose timestamp is more than five minutes old
+MAX_REQUEST_AGE_SECONDS = 5 * 60
+
+SignalApproval = Callable[[str, str], Awaitable[None]]
+
+
+def verify_signature(signing_secret: str, timestamp: str, body: bytes, signature: str) -> bool:
+    """Check Slack's X-Slack-Signature header for a request body."""
+    try:
+        if abs(time.time() - int(timestamp)) > MAX_REQUEST_AGE_SECONDS:
+            return False
+    except (TypeError, ValueError):
+        return False
+    base = f"v0:{timestamp}:".encode("utf-8") + body
+    expected = "v0=" + hmac.new(signing_secret.encode("utf-8"), base, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def create_app(signal_approval: SignalApproval, signing_secret: str = SLACK_SIGNING_SECRET) -> web.Application:
+    """Build the aiohttp app that turns white_check_mark reactions into approval signals."""
+
+    async def handle_event(request: web.Request) -> web.Response:
+        """Handle one Events API delivery."""
+        body = await request.read()
+        # Without a secret nothing can be verified, so nothing is accepted
+        if not signing_secret or not verify_signature(
+            signing_secret,
+            request.headers.get("X-Slack-Request-Timestamp", ""),
+            body,
+            request.headers.get("X-Slack-Signature", ""),
+        ):
+            return web.Response(status=401, text="invalid signature")
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return web.Response(status=400, text="invalid payload")
+
+        # Sent once when the request URL is configured in the Slack app settings
+        if payload.get("type") == "url_verification":
+            return web.json_response({"challenge": payload.get("challenge")})
+
+        event = payload.get("event") or {}
+        item = event.get("item") or {}
+        if (
+            payload.get("type") == "event_callback"
+            and event.get("type") == "reaction_added"
+            and event.get("reaction") == APPROVAL_REACTION
+            and item.get("type") == "message"
+        ):
+            try:
+                await signal_approval(item["channel"], item["ts"])
+            except Exception as e:
+                # Still acknowledge: Slack would only retry the same delivery, and the
+                # reconciliation sweep picks the approval up anyway.
+                print(f"Failed to signal approval for {item.get('channel')}/{item.get('ts')}: {e}")
+
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_post(SLACK_EVENTS_PATH, handle_event)
+    return app
+
+
+_runner: Optional[web.AppRunner] = None
+
+
+async def start_event_receiver(temporal_client: Client) -> None:
+    """Start the events endpoint, signalling the approval workflow for every approval.
+
+    Refuses to start without SLACK_SIGNING_SECRET: the endpoint is reachable from outside the
+    worker, and unsigned requests could otherwise approve arbitrary messages.
+    """
+    global _runner
+    if _runner is not None:
+        return
+    if not SLACK_SIGNING_SECRET:
+        raise RuntimeError("SLACK_EVENTS_ENABLED is set but SLACK_SIGNING_SECRET is empty, refusing to start the events receiver")
+
+    workflow_handle = temporal_client.get_workflow_handle(SLACK_APPROVAL_WORKFLOW_ID)
+
+    async def signal_approval(channel_id: str, ts: str) -> None:
+        """Send the approve signal to the approval workflow."""
+        try:
+            await workflow_handle.signal(APPROVE_SIGNAL, [channel_id, ts])
+        except RPCError as e:
+            # Usually the workflow is not running or is between runs; the sweep will catch up
+            print(f"Failed to signal {SLACK_APPROVAL_WORKFLOW_ID} about {channel_id}/{ts}: {e}")
+
+    runner = web.AppRunner(create_app(signal_approval))
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", SLACK_EVENTS_PORT).start()
+    _runner = runner
+
+
+async def stop_event_receiver() -> None:
+    """Stop the events endpoint if it is running."""
+    global _runner
+    if _runner is None:
+        return
+    try:
+        await _runner.cleanup()
+    finally:
+        _runner = None
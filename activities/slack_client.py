@@ -0,0 +1,121 @@
+"""
+Shared async Slack client and HTTP session.
+
+All Slack HTTP traffic from activities (Web API calls through the AsyncWebClient as well as
+raw requests for file uploads, downloads and webhooks through `get_session()`) goes through
+one aiohttp session per worker process. Connections to slack.com and the webhook host are kept
+alive and reused, DNS lookups are cached, the number of open connections is bounded, and
+rate-limited (HTTP 429) Web API responses are retried after Slack's Retry-After delay instead
+of failing the activity. `connection_stats()` reports how often connections were reused.
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional
+
+import aiohttp
+from dotenv import load_dotenv
+from slack_sdk.http_retry.builtin_async_handlers import (
+    AsyncConnectionErrorRetryHandler,
+    AsyncRateLimitErrorRetryHandler,
+)
+from slack_sdk.web.async_client import AsyncWebClient
+
+load_dotenv()
+
+SLACK_TOKEN = os.getenv("SLACK_TOKEN")
+
+SLACK_HTTP_MAX_CONNECTIONS = int(os.getenv("SLACK_HTTP_MAX_CONNECTIONS", "20"))
+SLACK_HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("SLACK_HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+SLACK_HTTP_KEEPALIVE_SECONDS = int(os.getenv("SLACK_HTTP_KEEPALIVE_SECONDS", "60"))
+SLACK_HTTP_DNS_CACHE_SECONDS = int(os.getenv("SLACK_HTTP_DNS_CACHE_SECONDS", "300"))
+SLACK_RATE_LIMIT_RETRIES = int(os.getenv("SLACK_RATE_LIMIT_RETRIES", "3"))
+
+
+_session: Optional[aiohttp.ClientSession] = None
+_client: Optional[AsyncWebClient] = None
+_client_lock = asyncio.Lock()
+
+_stats: Dict[str, int] = {
+    "requests": 0,
+    "connections_created": 0,
+    "connections_reused": 0,
+    "dns_cache_hits": 0,
+    "dns_cache_misses": 0,
+}
+
+
+def _count(name: str):
+    """Build a TraceConfig callback that increments one of the connection counters."""
+    async def callback(session, trace_config_ctx, params) -> None:
+        _stats[name] += 1
+    return callback
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    """Trace hooks feeding `connection_stats()`."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_count("requests"))
+    trace_config.on_connection_create_end.append(_count("connections_created"))
+    trace_config.on_connection_reuseconn.append(_count("connections_reused"))
+    trace_config.on_dns_cache_hit.append(_count("dns_cache_hits"))
+    trace_config.on_dns_cache_miss.append(_count("dns_cache_misses"))
+    return trace_config
+
+
+async def get_client() -> AsyncWebClient:
+    """Return the process-wide AsyncWebClient, creating it and its session on first use."""
+    global _session, _client
+    if _client is not None:
+        return _client
+
+    async with _client_lock:
+        if _client is not None:
+            return _client
+
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=SLACK_HTTP_MAX_CONNECTIONS,
+                limit_per_host=SLACK_HTTP_MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=SLACK_HTTP_KEEPALIVE_SECONDS,
+                use_dns_cache=True,
+                ttl_dns_cache=SLACK_HTTP_DNS_CACHE_SECONDS,
+            ),
+            trace_configs=[_trace_config()],
+        )
+        _client = AsyncWebClient(
+            token=SLACK_TOKEN,
+            session=_session,
+            retry_handlers=[
+                AsyncConnectionErrorRetryHandler(),
+                # Sleeps for the Retry-After header Slack sends with HTTP 429 before retrying
+                AsyncRateLimitErrorRetryHandler(max_retry_count=SLACK_RATE_LIMIT_RETRIES),
+            ],
+        )
+        return _client
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, for raw HTTP calls such as file uploads, downloads and webhooks."""
+    await get_client()
+    return _session
+
+
+def connection_stats() -> Dict[str, float]:
+    """Return request/connection counters and the share of requests served on a reused connection."""
+    stats: Dict[str, float] = dict(_stats)
+    connections = _stats["connections_created"] + _stats["connections_reused"]
+    stats["reuse_rate"] = _stats["connections_reused"] / connections if connections else 0.0
+    return stats
+
+
+async def shutdown_client() -> None:
+    """Close the shared session and drop the client."""
+    global _session, _client
+    if _session is None:
+        return
+    try:
+        await _session.close()
+    finally:
+        _session = None
+        _client = None
@@ -0,0 +1,151 @@
+"""
+Slack external file upload shared by the Telegram and approval activities.
+
+Runs the three-step files.getUploadURLExternal / upload / files.completeUploadExternal
+sequence over the shared Slack session, sending the raw image bytes as-is. When the caller
+needs the ts of the message the file was shared in (to reply in its thread), it is read from
+the completion response when Slack already includes it, and otherwise polled from files.info
+with exponential backoff instead of fixed one-second sleeps, waiting no longer in total than
+the old fixed sleeps did. Per-step timings are returned with the result.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Union
+
+from temporalio import activity
+
+from activities.slack_client import get_session as get_slack_session
+
+SLACK_API_URL = "https://slack.com/api"
+
+# files.info backoff: first retry after 0.25s, doubling, never sleeping more than 5s in total
+SHARE_TS_INITIAL_DELAY = 0.25
+SHARE_TS_MAX_ATTEMPTS = 6
+SHARE_TS_MAX_WAIT = 5.0
+
+
+def find_share_ts(file_obj: Dict[str, Any]) -> Optional[str]:
+    """Return the ts of the message a file was shared in, from its public or private shares."""
+    shares = file_obj.get('shares') or {}
+    for share_type in ['public', 'private']:
+        for share_list in (shares.get(share_type) or {}).values():
+            if share_list and share_list[0].get('ts'):
+                return share_list[0]['ts']
+    return None
+
+
+async def _wait_for_share_ts(session, token: str, file_id: str) -> Optional[str]:
+    """Poll files.info with exponential backoff until the file's share ts shows up."""
+    delay = SHARE_TS_INITIAL_DELAY
+    waited = 0.0
+    for attempt in range(SHARE_TS_MAX_ATTEMPTS):
+        async with session.get(
+            f'{SLACK_API_URL}/files.info',
+            params={'file': file_id},
+            headers={'Authorization': f'Bearer {token}'}
+        ) as file_info_resp:
+            file_info_result = await file_info_resp.json()
+
+        if file_info_result.get('ok') and file_info_result.get('file'):
+            message_ts = find_share_ts(file_info_result['file'])
+            if message_ts:
+                return message_ts
+
+        remaining = SHARE_TS_MAX_WAIT - waited
+        if attempt + 1 >= SHARE_TS_MAX_ATTEMPTS or remaining <= 0:
+            break
+        pause = min(delay, remaining)
+        activity.logger.info(f"files.info attempt {attempt + 1}: shares not ready yet, retrying in {pause}s")
+        await asyncio.sleep(pause)
+        waited += pause
+        delay *= 2
+
+    return None
+
+
+async def upload_file(
+    data: Union[bytes, memoryview],
+    *,
+    token: str,
+    channel_id: str,
+    initial_comment: str,
+    filename: str = 'image.jpg',
+    title: str = 'Image',
+    want_message_ts: bool = False,
+) -> Dict[str, Any]:
+    """Upload a file to Slack and share it to a channel with a comment.
+
+    Returns a dict with `complete_result` (the files.completeUploadExternal response),
+    `message_ts` (the ts of the share message, only looked up when `want_message_ts` is set)
+    and `timings` (seconds spent in each step).
+    """
+    session = await get_slack_session()
+    timings: Dict[str, float] = {}
+
+    # Step 1: Get upload URL from Slack
+    started = time.perf_counter()
+    async with session.get(
+        f'{SLACK_API_URL}/files.getUploadURLExternal',
+        params={
+            'filename': filename,
+            'length': len(data)
+        },
+        headers={'Authorization': f'Bearer {token}'}
+    ) as upload_url_resp:
+        upload_url_result = await upload_url_resp.json()
+    timings['get_upload_url'] = time.perf_counter() - started
+
+    if not upload_url_result.get('ok'):
+        raise RuntimeError(f"Failed to get upload URL: {upload_url_result.get('error')}")
+
+    upload_url = upload_url_result['upload_url']
+    file_id = upload_url_result['file_id']
+
+    # Step 2: Upload the raw bytes to the provided URL
+    started = time.perf_counter()
+    async with session.post(
+        upload_url,
+        data=data,
+        headers={'Content-Type': 'application/octet-stream'}
+    ) as upload_resp:
+        if upload_resp.status != 200:
+            raise RuntimeError(f"File upload failed with status: {upload_resp.status}")
+    timings['upload'] = time.perf_counter() - started
+
+    # Step 3: Complete the upload and share to channel
+    started = time.perf_counter()
+    async with session.post(
+        f'{SLACK_API_URL}/files.completeUploadExternal',
+        json={
+            'files': [{'id': file_id, 'title': title}],
+            'channel_id': channel_id,
+            'initial_comment': initial_comment
+        },
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json'
+        }
+    ) as complete_resp:
+        complete_result = await complete_resp.json()
+    timings['complete'] = time.perf_counter() - started
+
+    if not complete_result.get('ok'):
+        raise RuntimeError(f"Failed to complete upload: {complete_result.get('error')}")
+
+    message_ts = None
+    if want_message_ts:
+        started = time.perf_counter()
+        files = complete_result.get('files') or [{}]
+        message_ts = find_share_ts(files[0])
+        if not message_ts and files[0].get('id'):
+            message_ts = await _wait_for_share_ts(session, token, files[0]['id'])
+        timings['share_ts'] = time.perf_counter() - started
+        if not message_ts:
+            activity.logger.warning(f"Could not get message_ts for file {file_id}")
+
+    activity.logger.info(
+        f"Uploaded {len(data)} bytes to Slack as file {file_id}, step timings: "
+        + ", ".join(f"{step}={seconds:.3f}s" for step, seconds in timings.items())
+    )
+    return {'complete_result': complete_result, 'message_ts': message_ts, 'timings': timings}
@@ -1,7 +1,11 @@
 from temporalio import activity
+import asyncio
 import os
 import re
+from typing import Any, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from .translation_cache import get_cache, make_key as make_cache_key
+from activities.text_store import is_ref as is_text_ref, put as text_store_put, resolve as resolve_text
 load_dotenv()
 
 
@@ -92,17 +96,30 @@ def format_telegram_to_slack(text: str) -> str:
 
 api_key = os.getenv("ANTHROPIC_API_KEY")
 
-@activity.defn
-async def get_claude_answer_activity(context: str) -> str:
-    """Validate message content with Claude and translate to English if valid."""
-    from anthropic import Anthropic
-    client = Anthropic(api_key=api_key)
+MODEL = "claude-sonnet-4-5-20250929"
 
-    # Apply regex formatting before Claude processing
-    formatted_context = format_telegram_to_slack(context)
+# Upper bound on in-flight Claude requests per worker process, and on the HTTP pool size.
+ANTHROPIC_MAX_CONCURRENCY = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "4"))
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "10"))
+
+# "two_step": separate VALID/INVALID check, then translation (two requests per message).
+# "single": one request returning verdict and translation together via a forced tool call.
+CLAUDE_TRANSLATE_MODE = os.getenv("CLAUDE_TRANSLATE_MODE", "two_step")
+
+# Maximum number of messages sent to Claude in one batched request; larger batches are split.
+CLAUDE_BATCH_MAX_MESSAGES = int(os.getenv("CLAUDE_BATCH_MAX_MESSAGES", "8"))
+
+# Output budget for one message's tool call. The translation comes back as a JSON string, so escaped
+# quotes and newlines push it past the size of the plain-text answer the two-step path gets 1000 for.
+MAX_TOKENS_PER_MESSAGE = 2048
 
-    # First, check if the message is appropriate and relevant
-    validation_instructions = """
+# Non-streaming requests above roughly 21k output tokens are refused by the SDK, so batches stay under this.
+BATCH_MAX_TOKENS = 16000
+
+# Bump whenever the prompts below change so cached translations from old prompts are not reused.
+PROMPT_VERSION = "2"
+
+VALIDATION_INSTRUCTIONS = """
 You are a content validator for a news and AI technology aggregation system.
 
 Analyze the provided message and determine:
@@ -116,11 +133,210 @@ Respond with ONLY one word:
 Be strict: only allow messages that are clearly about news, AI, technology, science, current events, or related professional topics.
 """
 
-    validation_message = client.messages.create(
-        model="claude-sonnet-4-5-20250929",
+TRANSLATION_INSTRUCTIONS = """
+You are a translation assistant.
+
+Translate the provided text to English if it is not already in English. Follow these rules:
+
+1. Preserve all the content and meaning.
+2. Do not change any links or formatting. Keep URLs and formatting exactly as they are.
+3. Preserve emojis and line breaks.
+4. If the text is already in English, return it as is.
+5. Output only the translated text. Do not include explanations.
+"""
+
+SINGLE_CALL_INSTRUCTIONS = """
+You are a content validator and translation assistant for a news and AI technology aggregation system.
+
+First, decide whether the provided message is VALID or INVALID:
+- "VALID" if it is clearly about news, AI, technology, science, current events, or related professional topics, and is appropriate
+- "INVALID" if it is spam, harassment, explicit content, an advertisement, off-topic, or not relevant
+
+Be strict: only allow messages that are clearly about news, AI, technology, science, current events, or related professional topics.
+
+If the message is VALID, translate it to English if it is not already in English. Follow these rules:
+
+1. Preserve all the content and meaning.
+2. Do not change any links or formatting. Keep URLs and formatting exactly as they are.
+3. Preserve emojis and line breaks.
+4. If the text is already in English, return it as is.
+5. The translation must contain only the translated text. Do not include explanations.
+
+If the message is INVALID, leave the translation empty.
+
+Always answer by calling the submit_result tool.
+"""
+
+SUBMIT_RESULT_TOOL = {
+    "name": "submit_result",
+    "description": "Submit the validation verdict and the English translation of the message.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "verdict": {"type": "string", "enum": ["VALID", "INVALID"]},
+            "translation": {
+                "type": "string",
+                "description": "English translation of the message; empty when the verdict is INVALID.",
+            },
+        },
+        "required": ["verdict", "translation"],
+    },
+}
+
+
+BATCH_INSTRUCTIONS = """
+You are a content validator and translation assistant for a news and AI technology aggregation system.
+
+You will receive several independent messages, each wrapped in a <message index="N"> tag. Handle every message on its own.
+
+For each message, first decide whether it is VALID or INVALID:
+- "VALID" if it is clearly about news, AI, technology, science, current events, or related professional topics, and is appropriate
+- "INVALID" if it is spam, harassment, explicit content, an advertisement, off-topic, or not relevant
+
+Be strict: only allow messages that are clearly about news, AI, technology, science, current events, or related professional topics.
+
+If a message is VALID, translate it to English if it is not already in English. Follow these rules:
+
+1. Preserve all the content and meaning.
+2. Do not change any links or formatting. Keep URLs and formatting exactly as they are.
+3. Preserve emojis and line breaks.
+4. If the text is already in English, return it as is.
+5. The translation must contain only the translated text. Do not include explanations.
+
+If a message is INVALID, leave its translation empty.
+
+Always answer by calling the submit_results tool with exactly one result per message, using the message's index.
+"""
+
+SUBMIT_RESULTS_TOOL = {
+    "name": "submit_results",
+    "description": "Submit the validation verdict and English translation for every message.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {"type": "integer"},
+                        "verdict": {"type": "string", "enum": ["VALID", "INVALID"]},
+                        "translation": {
+                            "type": "string",
+                            "description": "English translation of the message; empty when the verdict is INVALID.",
+                        },
+                    },
+                    "required": ["index", "verdict", "translation"],
+                },
+            },
+        },
+        "required": ["results"],
+    },
+}
+
+
+_client: Optional[Any] = None
+_client_lock = asyncio.Lock()
+_request_semaphore = asyncio.Semaphore(ANTHROPIC_MAX_CONCURRENCY)
+
+
+async def get_client():
+    """Return a process-wide AsyncAnthropic client, creating it on first use.
+
+    One client means one HTTP connection pool, so keep-alive connections to the API are
+    reused across activities instead of paying TCP + TLS setup on every message.
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    async with _client_lock:
+        if _client is not None:
+            return _client
+
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient, DEFAULT_CONNECTION_LIMITS
+
+        # Build the Limits object through the SDK's own default so we use whichever httpx it ships with
+        limits = type(DEFAULT_CONNECTION_LIMITS)(
+            max_connections=ANTHROPIC_MAX_CONNECTIONS,
+            max_keepalive_connections=ANTHROPIC_MAX_CONNECTIONS,
+        )
+        _client = AsyncAnthropic(
+            api_key=api_key,
+            http_client=DefaultAsyncHttpxClient(limits=limits),
+        )
+        return _client
+
+
+async def shutdown_client() -> None:
+    """Close the shared client and its connection pool."""
+    global _client
+    if _client is None:
+        return
+    try:
+        await _client.close()
+    finally:
+        _client = None
+
+
+def cached_system(instructions: str) -> list:
+    """Wrap static instructions in a system block marked for prompt caching.
+
+    The cached prefix is the tool definitions plus these instructions. The API only caches
+    prefixes of at least 1024 tokens on Sonnet and silently ignores the marker on shorter ones,
+    which is the case for every prompt in this module today.
+    """
+    return [{"type": "text", "text": instructions.strip(), "cache_control": {"type": "ephemeral"}}]
+
+
+# Running totals of input tokens across all calls in this process, split by prompt-cache status.
+usage_totals = {
+    "calls": 0,
+    "input_tokens": 0,
+    "cache_creation_input_tokens": 0,
+    "cache_read_input_tokens": 0,
+    "output_tokens": 0,
+}
+
+
+def record_usage(message) -> dict:
+    """Add one response's token usage to the running totals and return the per-call numbers."""
+    usage = getattr(message, "usage", None)
+    call_usage = {}
+    for name in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens"):
+        # Cache fields are None when prompt caching did not apply to the request
+        value = getattr(usage, name, None)
+        call_usage[name] = value if isinstance(value, int) else 0
+    usage_totals["calls"] += 1
+    for name, value in call_usage.items():
+        usage_totals[name] += value
+    return call_usage
+
+
+async def _create_message(**kwargs):
+    """Send one Messages API request, waiting for a free slot under the concurrency cap."""
+    client = await get_client()
+    async with _request_semaphore:
+        message = await client.messages.create(**kwargs)
+
+    call_usage = record_usage(message)
+    activity.logger.info(
+        f"Claude usage: uncached input={call_usage['input_tokens']}, "
+        f"cache write={call_usage['cache_creation_input_tokens']}, "
+        f"cache read={call_usage['cache_read_input_tokens']}, "
+        f"output={call_usage['output_tokens']}"
+    )
+    return message
+
+
+async def _validate_and_translate_two_step(formatted_context: str) -> str:
+    """Run the VALID/INVALID check and, for valid messages, a separate translation request."""
+    validation_message = await _create_message(
+        model=MODEL,
         max_tokens=10,
+        system=cached_system(VALIDATION_INSTRUCTIONS),
         messages=[
-            {"role": "user", "content": f"{validation_instructions}\n\nMessage to validate:\n{formatted_context}"}
+            {"role": "user", "content": f"Message to validate:\n{formatted_context}"}
         ]
     )
 
@@ -132,25 +348,191 @@ Be strict: only allow messages that are clearly about news, AI, technology, scie
         return ""
 
     # If valid, proceed with translation
-    instructions = """
-You are a translation assistant.
+    message = await _create_message(
+        model=MODEL,
+        max_tokens=1000,
+        system=cached_system(TRANSLATION_INSTRUCTIONS),
+        messages=[
+            {"role": "user", "content": formatted_context}
+        ]
+    )
 
-Translate the provided text to English if it is not already in English. Follow these rules:
+    return message.content[0].text
 
-1. Preserve all the content and meaning.
-2. Do not change any links or formatting. Keep URLs and formatting exactly as they are.
-3. Preserve emojis and line breaks.
-4. If the text is already in English, return it as is.
-5. Output only the translated text. Do not include explanations.
-"""
 
-    message = client.messages.create(
-        model="claude-sonnet-4-5-20250929",
-        max_tokens=1000,
+async def _validate_and_translate_single(formatted_context: str) -> str:
+    """Get the verdict and the translation from one request with a forced tool call."""
+    message = await _create_message(
+        model=MODEL,
+        max_tokens=MAX_TOKENS_PER_MESSAGE,
+        tools=[SUBMIT_RESULT_TOOL],
+        tool_choice={"type": "tool", "name": SUBMIT_RESULT_TOOL["name"]},
+        system=cached_system(SINGLE_CALL_INSTRUCTIONS),
         messages=[
-            {"role": "user", "content": f"{instructions}\n\n{formatted_context}"}
+            {"role": "user", "content": f"Message:\n{formatted_context}"}
         ]
     )
 
+    if message.stop_reason == "max_tokens":
+        # A cut-off tool call has a partial (or missing) translation; the plain-text path is not escaped
+        activity.logger.warning("Single-request answer hit max_tokens, falling back to the two-step path")
+        return await _validate_and_translate_two_step(formatted_context)
+
+    result = next(
+        (block.input for block in message.content if getattr(block, "type", None) == "tool_use"),
+        None,
+    )
+    if not isinstance(result, dict):
+        raise RuntimeError("Claude response did not contain a submit_result tool call")
+
+    verdict = str(result.get("verdict", "")).strip().upper()
+    if verdict != "VALID":
+        activity.logger.info(f"Message filtered out as invalid: {verdict}")
+        return ""
+
+    return result.get("translation") or ""
+
+
+async def _validate_and_translate(formatted_context: str) -> str:
+    """Run the configured validate/translate mode and clean up the resulting markdown."""
+    if CLAUDE_TRANSLATE_MODE == "single":
+        translated = await _validate_and_translate_single(formatted_context)
+    else:
+        translated = await _validate_and_translate_two_step(formatted_context)
+
     # Clean up any malformed markdown from translation
-    return cleanup_markdown(message.content[0].text)
+    return cleanup_markdown(translated)
+
+
+def _cache_key(context: str) -> str:
+    """Translation cache key for a raw message under the current prompts and model."""
+    return make_cache_key(context, f"{PROMPT_VERSION}-{CLAUDE_TRANSLATE_MODE}", MODEL)
+
+
+@activity.defn
+async def get_claude_answer_activity(context: str) -> str:
+    """Validate message content with Claude and translate to English if valid.
+
+    A text store reference in gives a reference to the translation out.
+    """
+    if is_text_ref(context):
+        return await text_store_put(await get_claude_answer_activity(await resolve_text(context)))
+
+    # Apply regex formatting before Claude processing
+    formatted_context = format_telegram_to_slack(context)
+
+    cache = get_cache()
+    if cache is None:
+        return await _validate_and_translate(formatted_context)
+
+    async def compute():
+        """Produce the (verdict, translation) pair to store for this message."""
+        translated = await _validate_and_translate(formatted_context)
+        return ("VALID" if translated else "INVALID"), translated
+
+    hits_before = cache.hits
+    _, translated = await cache.get_or_compute(_cache_key(context), compute)
+    if cache.hits > hits_before:
+        # stats() counts rows in SQLite, so keep it off the event loop
+        activity.logger.info(f"Translation cache hit, stats: {await asyncio.to_thread(cache.stats)}")
+    return translated
+
+
+async def _validate_and_translate_batch(formatted_contexts: List[str]) -> List[str]:
+    """Validate and translate several messages with one forced tool call, in input order."""
+    prompt = "\n\n".join(
+        f'<message index="{i}">\n{text}\n</message>' for i, text in enumerate(formatted_contexts)
+    )
+    message = await _create_message(
+        model=MODEL,
+        max_tokens=min(MAX_TOKENS_PER_MESSAGE * len(formatted_contexts), BATCH_MAX_TOKENS),
+        tools=[SUBMIT_RESULTS_TOOL],
+        tool_choice={"type": "tool", "name": SUBMIT_RESULTS_TOOL["name"]},
+        system=cached_system(BATCH_INSTRUCTIONS),
+        messages=[
+            {"role": "user", "content": prompt}
+        ]
+    )
+
+    if message.stop_reason == "max_tokens":
+        # Results from a cut-off tool call cannot be trusted; translate each message on its own instead
+        activity.logger.warning(
+            f"Batch answer for {len(formatted_contexts)} messages hit max_tokens, retrying them individually"
+        )
+        return list(await asyncio.gather(*(_validate_and_translate(text) for text in formatted_contexts)))
+
+    tool_input = next(
+        (block.input for block in message.content if getattr(block, "type", None) == "tool_use"),
+        None,
+    )
+    if not isinstance(tool_input, dict):
+        raise RuntimeError("Claude response did not contain a submit_results tool call")
+
+    by_index: Dict[int, dict] = {}
+    for result in tool_input.get("results") or []:
+        if isinstance(result, dict) and isinstance(result.get("index"), int):
+            by_index[result["index"]] = result
+
+    translations = []
+    for i, formatted_context in enumerate(formatted_contexts):
+        result = by_index.get(i)
+        if result is None:
+            # The model skipped this message; fall back to the per-message path for it alone
+            activity.logger.warning(f"Batch response had no result for message {i}, retrying it individually")
+            translations.append(await _validate_and_translate(formatted_context))
+            continue
+
+        verdict = str(result.get("verdict", "")).strip().upper()
+        if verdict != "VALID":
+            activity.logger.info(f"Message {i} filtered out as invalid: {verdict}")
+            translations.append("")
+        else:
+            translations.append(cleanup_markdown(result.get("translation") or ""))
+
+    return translations
+
+
+@activity.defn
+async def get_claude_answers_batch_activity(contexts: List[str]) -> List[str]:
+    """Validate and translate all messages from one poll cycle, returning results in input order.
+
+    Rejected messages map to "" exactly like get_claude_answer_activity. Cached messages are
+    answered from the translation cache, duplicates and texts already being translated elsewhere
+    are merged with that request, and the rest are sent to Claude in chunks of at most
+    CLAUDE_BATCH_MAX_MESSAGES, with the chunks running concurrently under the usual cap.
+    Text store references in give references to the translations out.
+    """
+    if any(is_text_ref(context) for context in contexts):
+        translations = await get_claude_answers_batch_activity([await resolve_text(context) for context in contexts])
+        return [await text_store_put(translated) for translated in translations]
+
+    # Identical texts in one batch (cross-posts polled together) are translated once
+    keys = [_cache_key(context) for context in contexts]
+    context_for_key = dict(zip(keys, contexts))
+
+    async def compute(missing: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Translate the given keys' messages in chunks and return (verdict, translation) per key."""
+        activity.logger.info(
+            f"Batch of {len(contexts)} messages: {len(missing)} distinct to Claude, the rest cached or in flight"
+        )
+        chunks = [
+            missing[start:start + CLAUDE_BATCH_MAX_MESSAGES]
+            for start in range(0, len(missing), CLAUDE_BATCH_MAX_MESSAGES)
+        ]
+        chunk_results = await asyncio.gather(*(
+            _validate_and_translate_batch([format_telegram_to_slack(context_for_key[key]) for key in chunk])
+            for chunk in chunks
+        ))
+        computed = {}
+        for chunk, translations in zip(chunks, chunk_results):
+            for key, translated in zip(chunk, translations):
+                computed[key] = ("VALID" if translated else "INVALID"), translated
+        return computed
+
+    cache = get_cache()
+    if cache is None:
+        entries = await compute(list(context_for_key))
+    else:
+        entries = await cache.get_or_compute_many(keys, compute)
+
+    return [entries[key][1] for key in keys]
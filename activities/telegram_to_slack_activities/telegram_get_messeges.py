@@ -1,5 +1,4 @@
 import asyncio
-import base64
 import os
 from io import BytesIO
 from typing import Any, Dict, List, Optional
@@ -11,6 +10,7 @@ from telethon.sessions import StringSession
 from temporalio import activity
 
 from activities.image_store import put as image_store_put
+from activities.text_store import put as text_store_put
 
 load_dotenv()
 
@@ -69,64 +69,65 @@ async def shutdown_client() -> None:
         _client = None
 
 
+def _heartbeat_progress(received: int, total: int) -> None:
+    """Report media download progress as an activity heartbeat."""
+    try:
+        activity.heartbeat({"received": received, "total": total})
+    except Exception:
+        pass
+
+
 @activity.defn
-async def fetch_last_message(channel_username: str, limit: int = 5) -> List[Dict[str, Any]]:
-    """Fetch the last few messages from a Telegram channel, oldest to newest."""
+async def fetch_last_message(
+    channel_username: str, limit: int = 5, min_id: int = 0, by_reference: bool = False
+) -> List[Dict[str, Any]]:
+    """Fetch up to `limit` messages from a Telegram channel, oldest to newest.
+
+    Without `min_id` these are the channel's latest messages. With `min_id` (the last processed
+    id) they are the oldest messages after it, so a backlog longer than `limit` is drained over
+    several calls instead of losing everything but its newest posts. Photos are not downloaded here:
+    messages with a photo carry a lightweight `media` reference that `download_telegram_media`
+    resolves once the message has passed validation. With `by_reference`, each text is put in
+    the text store and only its reference is returned.
+    """
     try:
         client = await get_client()
 
         entity = await client.get_entity(channel_username)
-        activity.logger.info(f"Fetching last {limit} messages from {channel_username}")
-
-        def heartbeat_progress(received: int, total: int) -> None:
-            try:
-                activity.heartbeat({"received": received, "total": total})
-            except Exception:
-                pass
+        activity.logger.info(f"Fetching up to {limit} messages newer than {min_id} from {channel_username}")
 
         messages: List[Dict[str, Any]] = []
 
-        async for msg in client.iter_messages(entity, limit=limit):
+        # Telegram lists newest first; once we have a last processed id, walk forward from it instead
+        oldest_first = min_id > 0
+        async for msg in client.iter_messages(entity, limit=limit, min_id=min_id, reverse=oldest_first):
             activity.heartbeat({"phase": "iter", "msg_id": msg.id})
 
             message_data: Dict[str, Any] = {
                 "id": msg.id,
                 "date": msg.date.isoformat(),
-                "text": msg.text or "",
+                "text": await text_store_put(msg.text or "") if by_reference else msg.text or "",
                 "has_image": False,
                 "image_data": None,
+                "media": None,
             }
 
             if msg.photo:
-                try:
-                    photo_bytes = BytesIO()
-                    await client.download_media(
-                        msg.photo,
-                        photo_bytes,
-                        progress_callback=heartbeat_progress,
-                    )
-                    photo_bytes.seek(0)
-
-                    image_base64 = base64.b64encode(photo_bytes.read()).decode("utf-8")
-
-                    message_data["has_image"] = True
-                    message_data["image_data"] = image_store_put(image_base64)
-
-                    activity.logger.info(f"Downloaded image from message {msg.id}")
-                except asyncio.CancelledError:
-                    raise
-                except Exception as e:
-                    activity.logger.error(
-                        f"Failed to download image from message {msg.id}: {e}"
-                    )
+                message_data["has_image"] = True
+                message_data["media"] = {
+                    "channel": channel_username,
+                    "msg_id": msg.id,
+                    "photo_size": msg.file.size if msg.file else None,
+                }
 
             messages.append(message_data)
 
         if not messages:
-            activity.logger.warning(f"No messages found in channel {channel_username}")
+            # The normal steady state with min_id: nothing new since the last poll
+            activity.logger.info(f"No new messages in channel {channel_username}")
             return []
 
-        messages_oldest_first = list(reversed(messages))
+        messages_oldest_first = messages if oldest_first else list(reversed(messages))
 
         activity.logger.info(
             f"Returning {len(messages_oldest_first)} messages in chronological order"
@@ -144,3 +145,42 @@ async def fetch_last_message(channel_username: str, limit: int = 5) -> List[Dict
     except Exception as e:
         activity.logger.error(f"Unexpected error fetching Telegram messages: {str(e)}")
         raise
+
+
+@activity.defn
+async def download_telegram_media(media: Dict[str, Any]) -> Optional[str]:
+    """Download the photo behind a media reference from `fetch_last_message` into the image store.
+
+    Returns the image store key, or None if the message or its photo is gone or the download
+    fails, in which case the message is sent without the image.
+    """
+    channel_username, msg_id = media["channel"], media["msg_id"]
+    try:
+        client = await get_client()
+
+        msg = await client.get_messages(channel_username, ids=msg_id)
+        if msg is None or not msg.photo:
+            activity.logger.warning(f"Message {msg_id} in {channel_username} no longer has a photo")
+            return None
+
+        photo_bytes = BytesIO()
+        await client.download_media(
+            msg.photo,
+            photo_bytes,
+            progress_callback=_heartbeat_progress,
+        )
+
+        # getbuffer() exposes the downloaded bytes without copying them
+        image_key = await image_store_put(photo_bytes.getbuffer())
+
+        activity.logger.info(
+            f"Downloaded image from message {msg_id} ({media.get('photo_size')} bytes)"
+        )
+        return image_key
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        activity.logger.error(
+            f"Failed to download image from message {msg_id}: {e}"
+        )
+        return None
@@ -0,0 +1,82 @@
+"""
+Push-based Telegram ingestion.
+
+Registers a Telethon `NewMessage` handler on the shared client from `get_client()` and
+forwards every new channel post to the monitor workflow as a `new_message` signal, so the
+workflow polls that channel within seconds instead of waiting for the next poll interval.
+With TG_CHANNEL_WORKFLOWS set, the signal goes straight to the channel's own child workflow
+under TelegramSupervisorWorkflow instead.
+Regular polling stays in place as the gap-filling fallback (missed updates, reconnects,
+channels the account is not subscribed to: Telegram only pushes posts from joined channels).
+"""
+
+import logging
+import os
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+from telethon import events
+from temporalio.client import Client
+from temporalio.service import RPCError, RPCStatusCode
+
+from workflows.telegram_to_slack_workflow import channel_workflow_id
+from .telegram_get_messeges import get_client
+
+load_dotenv()
+
+TG_PUSH_INGESTION = os.getenv("TG_PUSH_INGESTION", "").lower() in ("1", "true", "yes")
+TG_MONITOR_WORKFLOW_ID = os.getenv("TG_MONITOR_WORKFLOW_ID", "tg-monitor-1")
+# Run one child workflow per channel under TelegramSupervisorWorkflow instead of one monitor loop
+TG_CHANNEL_WORKFLOWS = os.getenv("TG_CHANNEL_WORKFLOWS", "").lower() in ("1", "true", "yes")
+
+NEW_MESSAGE_SIGNAL = "new_message"
+
+logger = logging.getLogger(__name__)
+
+
+_handler: Optional[Callable] = None
+_handler_client: Optional[Any] = None
+
+
+async def start_push_ingestion(temporal_client: Client) -> None:
+    """Register the NewMessage handler that signals the monitor workflow about new channel posts."""
+    global _handler, _handler_client
+    if _handler is not None:
+        return
+
+    telegram_client = await get_client()
+    workflow_handle = temporal_client.get_workflow_handle(TG_MONITOR_WORKFLOW_ID)
+
+    async def on_new_message(event: Any) -> None:
+        """Signal the monitor workflow with the channel username and message id."""
+        chat = await event.get_chat()
+        username = getattr(chat, "username", None)
+        if not username:
+            return
+        handle = workflow_handle
+        if TG_CHANNEL_WORKFLOWS:
+            handle = temporal_client.get_workflow_handle(channel_workflow_id(TG_MONITOR_WORKFLOW_ID, username))
+        try:
+            await handle.signal(NEW_MESSAGE_SIGNAL, [username, event.message.id])
+        except RPCError as e:
+            if TG_CHANNEL_WORKFLOWS and e.status == RPCStatusCode.NOT_FOUND:
+                # A joined channel that isn't monitored has no child workflow
+                return
+            # Usually the workflow is not running or is between runs; polling will catch up
+            logger.warning(f"Failed to signal {handle.id} about {username}/{event.message.id}: {e}")
+
+    telegram_client.add_event_handler(on_new_message, events.NewMessage(func=lambda e: e.is_channel and not e.is_group))
+    _handler = on_new_message
+    _handler_client = telegram_client
+
+
+def stop_push_ingestion() -> None:
+    """Remove the NewMessage handler if it was registered."""
+    global _handler, _handler_client
+    if _handler is None:
+        return
+    try:
+        _handler_client.remove_event_handler(_handler)
+    finally:
+        _handler = None
+        _handler_client = None
@@ -0,0 +1,260 @@
+"""
+Persistent translation cache keyed by message content.
+
+Channels we follow often cross-post or repost the same text. The cache stores the
+validation verdict and translation for a hash of the normalized text, the prompt
+version and the model, in a SQLite file so results survive worker restarts.
+Concurrent lookups for the same key while the first one is still waiting on Claude
+share that single in-flight request, whether they come from single or batched translations.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", "translation_cache.sqlite3")  # empty disables the cache
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "5000"))
+TRANSLATION_CACHE_TTL_SECONDS = int(os.getenv("TRANSLATION_CACHE_TTL_SECONDS", str(30 * 24 * 60 * 60)))  # 30 days
+
+# (verdict, translation) where verdict is "VALID" or "INVALID"
+CacheEntry = Tuple[str, str]
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies of a post share a cache key."""
+    text = unicodedata.normalize("NFC", text or "")
+    lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in text.splitlines()]
+    return '\n'.join(lines).strip()
+
+
+def make_key(text: str, prompt_version: str, model: str) -> str:
+    """Build the cache key from the normalized text, prompt version and model."""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class TranslationCache:
+    """SQLite-backed verdict/translation cache with TTL and LRU size eviction."""
+
+    def __init__(self, path: str, max_entries: int = TRANSLATION_CACHE_MAX_ENTRIES,
+                 ttl_seconds: int = TRANSLATION_CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " verdict TEXT NOT NULL,"
+            " translation TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_created_at ON translations (created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_access ON translations (last_access)")
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.merged = 0
+        self.evictions = 0
+
+    def _get_sync(self, key: str) -> Optional[CacheEntry]:
+        """Look up a key, dropping it if it has outlived the TTL."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT verdict, translation, created_at FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self.evictions += 1
+                return None
+            self._conn.execute("UPDATE translations SET last_access = ? WHERE key = ?", (now, key))
+            return row[0], row[1]
+
+    def _put_sync(self, key: str, verdict: str, translation: str) -> None:
+        """Insert or replace an entry, then apply TTL and size eviction."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, verdict, translation, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, verdict, translation, now, now),
+            )
+            expired = self._conn.execute(
+                "DELETE FROM translations WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            overflow = max(0, count - self.max_entries)
+            if overflow:
+                self._conn.execute(
+                    "DELETE FROM translations WHERE key IN"
+                    " (SELECT key FROM translations ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                )
+            self.evictions += max(0, expired) + overflow
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the cached (verdict, translation) for a key, or None on a miss."""
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Like get, but counts the lookup towards the hit/miss stats."""
+        cached = await self.get(key)
+        if cached is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return cached
+
+    async def put(self, key: str, verdict: str, translation: str) -> None:
+        """Store a verdict and translation under a key."""
+        await asyncio.to_thread(self._put_sync, key, verdict, translation)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[CacheEntry]]) -> CacheEntry:
+        """Return the cached entry or compute and store it, merging concurrent identical requests."""
+        if key in self._inflight:
+            self.merged += 1
+            return await asyncio.shield(self._inflight[key])
+
+        cached = await self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        # Another caller may have started computing the same key while we hit the database
+        if key in self._inflight:
+            self.merged += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+            await self.put(key, result[0], result[1])
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else was waiting on it
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def get_or_compute_many(
+        self, keys: List[str], compute: Callable[[List[str]], Awaitable[Dict[str, CacheEntry]]]
+    ) -> Dict[str, CacheEntry]:
+        """get_or_compute for several keys: one compute call covers every key that is neither cached
+        nor already in flight, and keys another request is computing are waited on instead.
+
+        Duplicate keys are looked up once. `compute` receives the missing keys and returns an entry
+        for each of them.
+        """
+        results: Dict[str, CacheEntry] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        owned: Dict[str, asyncio.Future] = {}
+
+        for key in dict.fromkeys(keys):
+            if key not in self._inflight:
+                cached = await self.get(key)
+                if cached is not None:
+                    self.hits += 1
+                    results[key] = cached
+                    continue
+            # Another caller may have started computing the same key while we hit the database
+            if key in self._inflight:
+                self.merged += 1
+                waiting[key] = self._inflight[key]
+                continue
+            self.misses += 1
+            owned[key] = self._inflight[key] = asyncio.get_running_loop().create_future()
+
+        try:
+            if owned:
+                computed = await compute(list(owned))
+                for key, future in owned.items():
+                    await self.put(key, computed[key][0], computed[key][1])
+                    results[key] = computed[key]
+                    future.set_result(computed[key])
+        except asyncio.CancelledError:
+            for future in owned.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in owned.values():
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()  # Mark as retrieved when nobody else was waiting on it
+            raise
+        finally:
+            for key in owned:
+                del self._inflight[key]
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters, the hit rate and the current number of entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "merged": self.merged,
+            "evictions": self.evictions,
+            "entries": entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[TranslationCache] = None
+
+
+def get_cache() -> Optional[TranslationCache]:
+    """Return the process-wide cache, or None when TRANSLATION_CACHE_PATH is empty."""
+    global _cache
+    if not TRANSLATION_CACHE_PATH:
+        return None
+    if _cache is None:
+        _cache = TranslationCache(TRANSLATION_CACHE_PATH)
+    return _cache
+
+
+def close_cache() -> None:
+    """Close the process-wide cache if it was opened."""
+    global _cache
+    if _cache is None:
+        return
+    try:
+        _cache.close()
+    finally:
+        _cache = None
@@ -0,0 +1,86 @@
+"""
+Local store for message texts passed through workflows by reference.
+
+With the `bodies_by_reference` workflow option, `fetch_last_message` puts each message text
+here and the workflow only carries a short "textref:<sha256>" string. The translation
+activities resolve it and hand back a reference to the translation, and `send_message_to_slack`
+resolves both at the very end. Full texts then never land in workflow history.
+
+References are content-addressed and are not consumed by reading, so activity retries and
+replays keep working. Texts live for IMAGE_STORE_TTL_SECONDS; with IMAGE_STORE_BACKEND=disk
+they are also written to the shared image store directory (off the event loop, like images),
+so every worker can resolve them.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from temporalio.exceptions import ApplicationError
+
+from activities import image_store
+
+REF_PREFIX = "textref:"
+
+# ApplicationError type raised when a reference can no longer be resolved
+TEXT_REF_MISSING_ERROR = "TextRefMissingError"
+
+# key -> (text, expires_at), in expiry order since every text gets the same TTL
+_store: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+
+def is_ref(value) -> bool:
+    """Return True if a value is a text store reference."""
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+async def put(text: str) -> str:
+    """Store a text and return its reference. Empty texts are returned as-is."""
+    if not text:
+        return text
+    now = time.monotonic()
+    _expire(now)
+
+    data = text.encode("utf-8")
+    key = hashlib.sha256(data).hexdigest()
+    backend = image_store.get_backend()
+    if backend is not None:
+        await asyncio.to_thread(backend.write, key, data)
+        image_store.start_gc(backend)
+
+    _store.pop(key, None)
+    _store[key] = (text, now + image_store.TTL_SECONDS)
+    return REF_PREFIX + key
+
+
+async def resolve(value: str) -> str:
+    """Return the text behind a reference; any other value is returned unchanged.
+
+    Raises a non-retryable ApplicationError if the text expired, so the workflow gives up on
+    this poll and fetches the message again on the next one.
+    """
+    if not is_ref(value):
+        return value
+    _expire(time.monotonic())
+
+    key = value[len(REF_PREFIX):]
+    entry = _store.get(key)
+    if entry is not None:
+        return entry[0]
+
+    backend = image_store.get_backend()
+    data = await asyncio.to_thread(backend.read, key) if backend is not None else None
+    if data is None:
+        raise ApplicationError(f"Text {key} expired before it was used", type=TEXT_REF_MISSING_ERROR, non_retryable=True)
+    return bytes(data).decode("utf-8")
+
+
+def _expire(now: float) -> None:
+    """Drop texts whose TTL has passed."""
+    while _store:
+        key, (_, expires_at) = next(iter(_store.items()))
+        if expires_at > now:
+            break
+        del _store[key]
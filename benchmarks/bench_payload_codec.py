@@ -0,0 +1,108 @@
+"""
+Benchmark the payload compression codec on payloads shaped like this project's traffic.
+
+Run from the repo root with: python benchmarks/bench_payload_codec.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import temporalio.converter
+
+from payload_codec import CompressionCodec, zstandard
+
+POST = (
+    "*Quality Engineering Challenges in 2025 and What to Do About Them in 2026*\n"
+    "New year, same old problems. Over the next three days we'll break down one problem at a time. "
+    "Quality software is not just about testing. It's the ability to integrate quality into the "
+    "entire development process, from idea to production. But even in 2026, many teams still face "
+    "fundamental problems.\n"
+    "*Challenge 1: Quality is a word, not an understanding.* Everyone agrees quality matters, yet "
+    "few teams can say which risks they accept, who owns them, or how they would notice a "
+    "regression before customers do. Start by writing down the three failures that would hurt "
+    "most and check whether anything in your pipeline would actually catch them.\n"
+    "Links to the slides and the recording are in the comments, see you tomorrow!"
+)
+
+# Five unrelated posts, as one fetch_last_message call returns them
+POSTS = [
+    POST,
+    "Anthropic shipped a new Claude model today. Early benchmarks show better tool use and "
+    "longer context handling; we'll run it against our internal eval suite this week and share "
+    "numbers. If you have prompts that used to fail, send them over and we'll include them.",
+    "Мітап у Києві 14 березня: говоримо про контрактне тестування мікросервісів, Pact і про те, "
+    "як не втопитися у версіях схем. Реєстрація за посиланням, кількість місць обмежена. "
+    "Після доповідей буде нетворкінг та піца.",
+    "Reminder: the free Playwright workshop starts in an hour. Bring a laptop with Node 20 "
+    "installed and clone the starter repo beforehand. We'll cover fixtures, trace viewer, "
+    "parallel sharding in CI and how to keep visual snapshots stable across browsers.",
+    "Podcast episode 87 is out. Our guest spent six years building the release process of a "
+    "large bank and explains why they moved from weekly release trains to continuous delivery, "
+    "what broke on the way, and which metrics convinced management that it was worth it.",
+]
+
+SAMPLES = {
+    "fetch_last_message result": [
+        {"id": 1000 + i, "date": "2026-01-05T10:00:00+00:00", "text": text, "has_image": i % 2 == 0,
+         "image_data": None, "media": {"channel": "automation_remarks_ua", "msg_id": 1000 + i, "photo_size": 184233}}
+        for i, text in enumerate(POSTS)
+    ],
+    "translation": POST,
+    "send_message_to_slack args": [POSTS[3], "automation_remarks_ua", True, "0f" * 32, 1004, POSTS[2]],
+    "complete_result": {
+        "ok": True,
+        "files": [{
+            "id": "F0ABCDEF123", "created": 1767607200, "timestamp": 1767607200, "name": "telegram_image.jpg",
+            "title": "Telegram Image", "mimetype": "image/jpeg", "filetype": "jpg", "user": "U0123456789",
+            "size": 184233, "url_private": "https://files.slack.com/files-pri/T0-F0ABCDEF123/telegram_image.jpg",
+            "url_private_download": "https://files.slack.com/files-pri/T0-F0ABCDEF123/download/telegram_image.jpg",
+            "thumb_360": "https://files.slack.com/files-tmb/T0-F0ABCDEF123-abc/telegram_image_360.jpg",
+            "thumb_480": "https://files.slack.com/files-tmb/T0-F0ABCDEF123-abc/telegram_image_480.jpg",
+            "thumb_720": "https://files.slack.com/files-tmb/T0-F0ABCDEF123-abc/telegram_image_720.jpg",
+            "permalink": "https://example.slack.com/files/U0123456789/F0ABCDEF123/telegram_image.jpg",
+            "shares": {"public": {"C09R8GCL2K1": [{"ts": "1767607201.000100", "channel_name": "news",
+                                                   "reply_count": 0, "reply_users": []}]}},
+            "initial_comment": {"comment": POST},
+        }],
+    },
+    "short status": {"ok": True},
+}
+
+ROUNDS = 200
+
+
+async def main():
+    converter = temporalio.converter.default().payload_converter
+    algorithms = ["zlib"] + (["zstd"] if zstandard is not None else [])
+
+    print(f"{'payload':<28}{'raw':>8}" + "".join(f"{a:>10}{a + ' us':>10}" for a in algorithms))
+    totals = {a: 0 for a in algorithms}
+    raw_total = 0
+    for name, value in SAMPLES.items():
+        payloads = converter.to_payloads([value])
+        raw = sum(len(p.SerializeToString()) for p in payloads)
+        raw_total += raw
+        row = f"{name:<28}{raw:>8}"
+        for algorithm in algorithms:
+            codec = CompressionCodec(algorithm, threshold=1024)
+            started = time.perf_counter()
+            for _ in range(ROUNDS):
+                encoded = await codec.encode(payloads)
+                assert await codec.decode(encoded) == payloads
+            elapsed_us = (time.perf_counter() - started) / ROUNDS * 1e6
+            size = sum(len(p.SerializeToString()) for p in encoded)
+            totals[algorithm] += size
+            row += f"{size:>10}{elapsed_us:>10.0f}"
+        print(row)
+
+    for algorithm in algorithms:
+        saved = raw_total - totals[algorithm]
+        print(f"{algorithm}: {raw_total} -> {totals[algorithm]} bytes, saved {saved} ({saved / raw_total:.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Compressing payload codec for Temporal workflow and activity payloads.
+
+Message texts, translations and Slack API responses are stored in workflow history and sent
+over gRPC as plain JSON. With TEMPORAL_PAYLOAD_COMPRESSION set to "zlib" or "zstd", payloads of
+at least TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD bytes are compressed (zstd needs the optional
+`zstandard` package and falls back to zlib without it). A payload is kept as-is when
+compression doesn't make it smaller.
+
+The codec is installed on every client even with compression off, so histories written with
+compression on can still be read after turning it off, and uncompressed payloads from before
+it was enabled decode unchanged. The worker and both starter scripts must share the setting.
+Note that the Temporal UI and CLI show compressed payloads as opaque binary.
+"""
+
+import dataclasses
+import logging
+import os
+import zlib
+from typing import List, Optional, Sequence
+
+import temporalio.converter
+from dotenv import load_dotenv
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import PayloadCodec
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+load_dotenv()
+
+TEMPORAL_PAYLOAD_COMPRESSION = os.getenv("TEMPORAL_PAYLOAD_COMPRESSION", "").lower()
+TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD = int(os.getenv("TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD", "1024"))
+
+logger = logging.getLogger(__name__)
+
+ZLIB_ENCODING = b"binary/zlib"
+ZSTD_ENCODING = b"binary/zstd"
+
+
+class CompressionCodec(PayloadCodec):
+    """Compress payloads above a size threshold; decode compressed and plain payloads alike."""
+
+    def __init__(self, algorithm: Optional[str] = "zlib", threshold: int = 1024, level: Optional[int] = None) -> None:
+        if algorithm == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, compressing payloads with zlib instead")
+            algorithm = "zlib"
+        if algorithm not in (None, "", "zlib", "zstd"):
+            raise ValueError(f"Unknown payload compression {algorithm!r}, expected 'zlib' or 'zstd'")
+        self.algorithm = algorithm or None
+        self.threshold = threshold
+        self.level = level
+
+    def _compress(self, data: bytes) -> bytes:
+        """Compress serialized payload bytes with the configured algorithm."""
+        if self.algorithm == "zstd":
+            return zstandard.ZstdCompressor(level=self.level or 3).compress(data)
+        return zlib.compress(data, self.level if self.level is not None else 6)
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        """Compress every payload that is large enough and actually shrinks."""
+        if self.algorithm is None:
+            return list(payloads)
+
+        encoding = ZSTD_ENCODING if self.algorithm == "zstd" else ZLIB_ENCODING
+        encoded = []
+        for payload in payloads:
+            data = payload.SerializeToString()
+            if len(data) >= self.threshold:
+                compressed = self._compress(data)
+                if len(compressed) < len(data):
+                    payload = Payload(metadata={"encoding": encoding}, data=compressed)
+            encoded.append(payload)
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        """Decompress payloads written by this codec and pass all others through unchanged."""
+        decoded = []
+        for payload in payloads:
+            encoding = payload.metadata.get("encoding")
+            if encoding == ZLIB_ENCODING:
+                data = zlib.decompress(payload.data)
+            elif encoding == ZSTD_ENCODING:
+                if zstandard is None:
+                    raise RuntimeError("Payload is zstd-compressed but zstandard is not installed")
+                data = zstandard.ZstdDecompressor().decompress(payload.data)
+            else:
+                decoded.append(payload)
+                continue
+            original = Payload()
+            original.ParseFromString(data)
+            decoded.append(original)
+        return decoded
+
+
+def get_data_converter() -> temporalio.converter.DataConverter:
+    """Return the default JSON data converter with the compression codec configured from the environment."""
+    codec = CompressionCodec(TEMPORAL_PAYLOAD_COMPRESSION, TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD)
+    return dataclasses.replace(temporalio.converter.default(), payload_codec=codec)
@@ -1,19 +1,30 @@
 # run_workflow.py
 import asyncio
+import os
+import sys
 from temporalio.client import Client
 import time
 
+# Make the repo root importable when run as `python run_workflows/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from payload_codec import get_data_converter
+from task_queues import TASK_QUEUES
+
 
 async def main():
     """Start the Slack approval polling workflow on the Temporal server."""
-    client = await Client.connect("localhost:7233")
+    client = await Client.connect("localhost:7233", data_converter=get_data_converter())
+
 
+    # With the reaction_added receiver running, polling is only a slow reconciliation sweep
+    events_enabled = os.getenv("SLACK_EVENTS_ENABLED", "").lower() in ("1", "true", "yes")
+    options = {"poll_minutes": 30 if events_enabled else 5}
 
     result = await client.start_workflow(
         "PollSlackForReactionWorkflow",
-        ["C09R8GCL2K1", [], time.time()],
+        ["C09R8GCL2K1", [], time.time(), options],
         id="slack-monitor-1",
-        task_queue="multi-task-queue",
+        task_queue=TASK_QUEUES["workflows"],
     )
 
     print("Workflow started:", result)
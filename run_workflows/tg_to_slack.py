@@ -1,17 +1,27 @@
 # run_workflow.py
 import asyncio
+import os
+import sys
 from temporalio.client import Client
 import time
 
+# Make the repo root importable when run as `python run_workflows/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from payload_codec import get_data_converter
+from task_queues import TASK_QUEUES
+
 async def main():
     """Start the Telegram monitor workflow on the Temporal server."""
-    client = await Client.connect("localhost:7233")
+    client = await Client.connect("localhost:7233", data_converter=get_data_converter())
+
+    # One child workflow per channel under a supervisor, or every channel in one monitor loop
+    channel_workflows = os.getenv("TG_CHANNEL_WORKFLOWS", "").lower() in ("1", "true", "yes")
 
     result = await client.start_workflow(
-        "TelegramMonitorWorkflow",
+        "TelegramSupervisorWorkflow" if channel_workflows else "TelegramMonitorWorkflow",
         [["dmytrogorin", "automation_remarks_ua", "xpinjection_channel"], {}, time.time()],               # channel list "dmytrogorin", "automation_remarks_ua", "xpinjection_channel"
         id="tg-monitor-1",
-        task_queue="multi-task-queue",
+        task_queue=TASK_QUEUES["workflows"],
     )
 
     print("Workflow started:", result)
@@ -0,0 +1,59 @@
+"""
+Task queues and their per-queue worker limits.
+
+Workflows run on the workflows queue; their activities are split by the kind of work they do,
+so slow Claude calls and large image uploads don't take the slots of quick Telegram and Slack
+polls:
+
+    llm       get_claude_answer_activity, get_claude_answers_batch_activity
+    telegram  fetch_last_message, download_telegram_media
+    slack     send_message_to_slack, get_messages, get_recent_messages, check_reactions,
+              download_slack_image, resend_message
+
+Each queue's limits come from <QUEUE>_MAX_CONCURRENT_ACTIVITIES (per worker process),
+<QUEUE>_MAX_ACTIVITIES_PER_SECOND (per worker process) and
+<QUEUE>_TASK_QUEUE_ACTIVITIES_PER_SECOND (enforced by the server across all workers), e.g.
+LLM_MAX_CONCURRENT_ACTIVITIES=4. Unset rate limits mean no limit.
+
+When the queues run in separate processes, images and texts are handed from one queue's
+activities to another's through the stores, so set IMAGE_STORE_BACKEND=disk.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TASK_QUEUES: Dict[str, str] = {
+    "workflows": os.getenv("WORKFLOW_TASK_QUEUE", "multi-task-queue"),
+    "llm": os.getenv("LLM_TASK_QUEUE", "llm-task-queue"),
+    "telegram": os.getenv("TELEGRAM_TASK_QUEUE", "telegram-task-queue"),
+    "slack": os.getenv("SLACK_TASK_QUEUE", "slack-task-queue"),
+}
+
+# Default activity slots per worker process for each activity queue
+DEFAULT_MAX_CONCURRENT_ACTIVITIES: Dict[str, int] = {
+    "llm": 8,
+    "telegram": 4,
+    "slack": 20,
+}
+
+
+def _optional_float(name: str) -> Optional[float]:
+    """Read an optional float setting; unset or empty means None."""
+    value = os.getenv(name, "")
+    return float(value) if value else None
+
+
+def worker_limits(queue: str) -> Dict[str, Any]:
+    """Return the Worker keyword arguments that limit one activity queue."""
+    prefix = queue.upper()
+    return {
+        "max_concurrent_activities": int(
+            os.getenv(f"{prefix}_MAX_CONCURRENT_ACTIVITIES", str(DEFAULT_MAX_CONCURRENT_ACTIVITIES[queue]))
+        ),
+        "max_activities_per_second": _optional_float(f"{prefix}_MAX_ACTIVITIES_PER_SECOND"),
+        "max_task_queue_activities_per_second": _optional_float(f"{prefix}_TASK_QUEUE_ACTIVITIES_PER_SECOND"),
+    }
@@ -1,13 +1,28 @@
 import pytest
-from unittest.mock import patch, MagicMock
+import pytest_asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
 
+from activities import text_store
+from activities.telegram_to_slack_activities import claude_translate, translation_cache
 from activities.telegram_to_slack_activities.claude_translate import (
-    get_claude_answer_activity
+    get_claude_answer_activity,
+    get_claude_answers_batch_activity,
 )
 
 pytestmark = pytest.mark.asyncio
 
 
+@pytest.fixture(autouse=True)
+def reset_claude_client(monkeypatch):
+    """Drop the cached process-wide client so each test builds one from its own mock."""
+    claude_translate._client = None
+    # Keep the on-disk translation cache out of these tests
+    monkeypatch.setattr(translation_cache, "TRANSLATION_CACHE_PATH", "")
+    monkeypatch.setattr(translation_cache, "_cache", None)
+    yield
+    claude_translate._client = None
+
+
 def mock_anthropic_response(text: str):
     """Create a mock Anthropic API response with the given text."""
     mock_msg = MagicMock()
@@ -15,10 +30,11 @@ def mock_anthropic_response(text: str):
     return mock_msg
 
 
-@patch("anthropic.Anthropic")
+@patch("anthropic.AsyncAnthropic")
 async def test_invalid_message_is_filtered(mock_anthropic):
     """Verify that messages flagged as INVALID by Claude return an empty string."""
     mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock()
     mock_anthropic.return_value = mock_client
 
     # Validation call → INVALID
@@ -29,10 +45,11 @@ async def test_invalid_message_is_filtered(mock_anthropic):
     assert result == ""
 
 
-@patch("anthropic.Anthropic")
+@patch("anthropic.AsyncAnthropic")
 async def test_valid_message_is_processed(mock_anthropic):
     """Verify that valid messages are translated and returned with Slack formatting."""
     mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock()
     mock_anthropic.return_value = mock_client
 
     validation_response = mock_anthropic_response("VALID")
@@ -72,3 +89,223 @@ What to do:
     assert "*Quality Engineering Challenges in 2025" in result
     assert "Challenge 1" in result
     assert ":brain:" in result
+
+
+@patch("anthropic.AsyncAnthropic")
+async def test_client_is_shared_across_calls(mock_anthropic):
+    """Verify the Anthropic client is built once and reused by later activity calls."""
+    mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock(return_value=mock_anthropic_response("INVALID"))
+    mock_anthropic.return_value = mock_client
+
+    await get_claude_answer_activity("first message")
+    await get_claude_answer_activity("second message")
+
+    assert mock_anthropic.call_count == 1
+    assert mock_client.messages.create.await_count == 2
+
+
+def mock_tool_use_response(verdict: str, translation: str):
+    """Create a mock Anthropic API response carrying a submit_result tool call."""
+    mock_msg = MagicMock()
+    mock_msg.content = [MagicMock(type="tool_use", input={"verdict": verdict, "translation": translation})]
+    return mock_msg
+
+
+@patch.object(claude_translate, "CLAUDE_TRANSLATE_MODE", "single")
+@patch("anthropic.AsyncAnthropic")
+async def test_single_call_mode_translates_in_one_request(mock_anthropic):
+    """Verify single mode returns the translation from one tool-use response."""
+    mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock(
+        return_value=mock_tool_use_response("VALID", "**AI news** of the day")
+    )
+    mock_anthropic.return_value = mock_client
+
+    result = await get_claude_answer_activity("Новини **AI** дня")
+
+    assert result == "*AI news* of the day"
+    assert mock_client.messages.create.await_count == 1
+    kwargs = mock_client.messages.create.call_args.kwargs
+    assert kwargs["tool_choice"] == {"type": "tool", "name": "submit_result"}
+
+
+@patch.object(claude_translate, "CLAUDE_TRANSLATE_MODE", "single")
+@patch("anthropic.AsyncAnthropic")
+async def test_single_call_mode_filters_invalid(mock_anthropic):
+    """Verify single mode returns an empty string for rejected messages."""
+    mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock(
+        return_value=mock_tool_use_response("INVALID", "")
+    )
+    mock_anthropic.return_value = mock_client
+
+    result = await get_claude_answer_activity("Buy cheap crypto now!!!")
+
+    assert result == ""
+    assert mock_client.messages.create.await_count == 1
+
+
+@patch.object(claude_translate, "CLAUDE_TRANSLATE_MODE", "single")
+@patch("anthropic.AsyncAnthropic")
+async def test_single_call_mode_falls_back_when_cut_off(mock_anthropic):
+    """Verify a tool call cut off at max_tokens is not used and the two-step path answers instead."""
+    truncated = mock_tool_use_response("VALID", "AI news of")
+    truncated.stop_reason = "max_tokens"
+    mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock(side_effect=[
+        truncated,
+        mock_anthropic_response("VALID"),
+        mock_anthropic_response("AI news of the day"),
+    ])
+    mock_anthropic.return_value = mock_client
+
+    result = await get_claude_answer_activity("Новини AI дня")
+
+    assert result == "AI news of the day"
+    assert mock_client.messages.create.await_count == 3
+
+
+@patch("anthropic.AsyncAnthropic")
+async def test_batch_activity_retries_individually_when_cut_off(mock_anthropic):
+    """Verify a batch answer cut off at max_tokens is discarded and each message is translated on its own."""
+    truncated = MagicMock()
+    truncated.stop_reason = "max_tokens"
+    truncated.content = [MagicMock(type="tool_use", input={"results": [
+        {"index": 0, "verdict": "VALID", "translation": "Fir"},
+    ]})]
+    mock_client = MagicMock()
+
+    async def create(**kwargs):
+        if "tools" in kwargs:
+            return truncated
+        content = kwargs["messages"][0]["content"]
+        if content.startswith("Message to validate"):
+            return mock_anthropic_response("VALID")
+        return mock_anthropic_response("First" if "перше" in content else "Second")
+
+    mock_client.messages.create = AsyncMock(side_effect=create)
+    mock_anthropic.return_value = mock_client
+
+    result = await get_claude_answers_batch_activity(["перше", "друге"])
+
+    assert result == ["First", "Second"]
+    # One batch request, then a validation and a translation request per message
+    assert mock_client.messages.create.await_count == 5
+
+
+@patch("anthropic.AsyncAnthropic")
+async def test_batch_activity_returns_results_in_input_order(mock_anthropic):
+    """Verify the batch activity makes one request and maps results back by index."""
+    mock_msg = MagicMock()
+    mock_msg.content = [MagicMock(type="tool_use", input={"results": [
+        {"index": 2, "verdict": "VALID", "translation": "Third"},
+        {"index": 0, "verdict": "VALID", "translation": "**First**"},
+        {"index": 1, "verdict": "INVALID", "translation": ""},
+    ]})]
+    mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock(return_value=mock_msg)
+    mock_anthropic.return_value = mock_client
+
+    result = await get_claude_answers_batch_activity(["перше", "реклама", "третє"])
+
+    assert result == ["*First*", "", "Third"]
+    assert mock_client.messages.create.await_count == 1
+    prompt = mock_client.messages.create.call_args.kwargs["messages"][0]["content"]
+    assert '<message index="1">' in prompt
+
+
+@patch("anthropic.AsyncAnthropic")
+async def test_batch_activity_translates_duplicate_texts_once(mock_anthropic):
+    """Verify a post repeated within one batch is sent to Claude once and answered for every copy."""
+    mock_msg = MagicMock()
+    mock_msg.content = [MagicMock(type="tool_use", input={"results": [
+        {"index": 0, "verdict": "VALID", "translation": "First"},
+        {"index": 1, "verdict": "VALID", "translation": "Second"},
+    ]})]
+    mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock(return_value=mock_msg)
+    mock_anthropic.return_value = mock_client
+
+    result = await get_claude_answers_batch_activity(["перше", "друге", "перше  "])
+
+    assert result == ["First", "Second", "First"]
+    prompt = mock_client.messages.create.call_args.kwargs["messages"][0]["content"]
+    assert '<message index="2">' not in prompt
+
+
+@patch.object(claude_translate, "CLAUDE_TRANSLATE_MODE", "single")
+@patch("anthropic.AsyncAnthropic")
+async def test_text_reference_in_gives_reference_out(mock_anthropic):
+    """Verify a text store reference is resolved for Claude and the translation comes back as a reference."""
+    mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock(
+        return_value=mock_tool_use_response("VALID", "AI news of the day")
+    )
+    mock_anthropic.return_value = mock_client
+
+    result = await get_claude_answer_activity(await text_store.put("Новини AI дня"))
+
+    assert text_store.is_ref(result)
+    assert await text_store.resolve(result) == "AI news of the day"
+    assert "Новини AI дня" in str(mock_client.messages.create.call_args.kwargs["messages"])
+
+
+@pytest_asyncio.fixture
+async def fake_anthropic_server():
+    """Run a local fake Messages API endpoint that records request bodies."""
+    from aiohttp import web
+    from anthropic import AsyncAnthropic
+
+    requests = []
+
+    async def handle_messages(request):
+        body = await request.json()
+        requests.append(body)
+        return web.json_response({
+            "id": f"msg_{len(requests)}",
+            "type": "message",
+            "role": "assistant",
+            "model": body["model"],
+            "content": [{"type": "text", "text": "VALID" if len(requests) == 1 else "Translated text"}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": 15,
+                "output_tokens": 3,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 250,
+            },
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1/messages", handle_messages)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    claude_translate._client = AsyncAnthropic(api_key="test-key", base_url=f"http://127.0.0.1:{port}")
+    yield requests
+
+    await claude_translate.shutdown_client()
+    await runner.cleanup()
+
+
+async def test_static_instructions_are_sent_as_cached_system_blocks(fake_anthropic_server):
+    """Verify instructions go in cache-marked system blocks and cached tokens reported by the API are accounted."""
+    calls_before = claude_translate.usage_totals["calls"]
+    cache_read_before = claude_translate.usage_totals["cache_read_input_tokens"]
+
+    result = await get_claude_answer_activity("Новини про AI")
+
+    assert result == "Translated text"
+    assert len(fake_anthropic_server) == 2
+    for body in fake_anthropic_server:
+        # The marker is always sent; the API ignores it while the prefix is under the cacheable minimum
+        assert body["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert body["messages"][0]["content"].endswith("Новини про AI")
+        assert "You are a" not in body["messages"][0]["content"]
+    assert claude_translate.usage_totals["calls"] - calls_before == 2
+    assert claude_translate.usage_totals["cache_read_input_tokens"] - cache_read_before == 500
@@ -0,0 +1,71 @@
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from unittest.mock import patch
+
+from activities import image_store
+from activities.slack_approval_activities import get_reactions
+from activities.slack_approval_activities.get_reactions import download_image, has_approval
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def fake_file_server():
+    """Serve a small and a large fake image from a local HTTP server."""
+    async def small(request):
+        return web.Response(body=b"x" * 1000, content_type="image/jpeg")
+
+    async def large(request):
+        return web.Response(body=b"x" * 5000, content_type="image/jpeg")
+
+    async def login_page(request):
+        return web.Response(text="<!DOCTYPE html><html></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/small.jpg", small)
+    app.router.add_get("/large.jpg", large)
+    app.router.add_get("/login", login_page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    session = aiohttp.ClientSession()
+
+    async def get_session():
+        return session
+
+    with patch.object(get_reactions, "get_slack_session", get_session):
+        yield f"http://127.0.0.1:{port}"
+
+    await session.close()
+    await runner.cleanup()
+
+
+async def test_has_approval_looks_for_white_check_mark():
+    """Verify only the white_check_mark reaction counts as an approval."""
+    assert has_approval({"reactions": [{"name": "eyes"}, {"name": "white_check_mark"}]})
+    assert not has_approval({"reactions": [{"name": "eyes"}]})
+    assert not has_approval({})
+
+
+async def test_download_image_stores_image(fake_file_server):
+    """Verify a downloaded image ends up in the image store under the returned key."""
+    key = await download_image(f"{fake_file_server}/small.jpg", "1.0")
+
+    assert key is not None
+    assert bytes(await image_store.get(key)) == b"x" * 1000
+
+
+@patch.object(get_reactions, "SLACK_IMAGE_MAX_BYTES", 2000)
+async def test_download_image_enforces_size_cap(fake_file_server):
+    """Verify images over the size cap are skipped instead of stored."""
+    assert await download_image(f"{fake_file_server}/large.jpg", "1.0") is None
+
+
+async def test_download_image_rejects_html_login_page(fake_file_server):
+    """Verify Slack's HTML login page is not stored as an image."""
+    assert await download_image(f"{fake_file_server}/login", "1.0") is None
@@ -0,0 +1,10 @@
+from workflows.history import overrides_only
+from workflows.telegram_to_slack_workflow import DEFAULT_OPTIONS
+
+
+def test_overrides_only_keeps_what_differs_from_the_defaults():
+    """Verify a fully merged options dict from an older run shrinks back to its real overrides."""
+    merged = {**DEFAULT_OPTIONS, "pipeline_depth": 4, "custom": True}
+
+    assert overrides_only(merged, DEFAULT_OPTIONS) == {"pipeline_depth": 4, "custom": True}
+    assert overrides_only({}, DEFAULT_OPTIONS) == {}
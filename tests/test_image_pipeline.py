@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from activities import image_pipeline
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_disabled_stage_passes_images_through(monkeypatch):
+    """Verify images are uploaded untouched when the stage is off."""
+    monkeypatch.setattr(image_pipeline, "IMAGE_DOWNSCALE_ENABLED", False)
+    data = memoryview(b"x" * 2_000_000)
+
+    result, filename = await image_pipeline.prepare_for_upload(data, "telegram_image.jpg")
+
+    assert result is data
+    assert filename == "telegram_image.jpg"
+
+
+async def test_small_images_are_skipped(monkeypatch):
+    """Verify images under the size threshold are not re-encoded."""
+    monkeypatch.setattr(image_pipeline, "IMAGE_DOWNSCALE_ENABLED", True)
+    data = b"x" * 100
+
+    result, _ = await image_pipeline.prepare_for_upload(data, "image.jpg")
+
+    assert result is data
+
+
+async def test_large_image_is_downscaled(monkeypatch):
+    """Verify a large photo is resized to the max dimension and the savings are recorded."""
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(image_pipeline, "IMAGE_DOWNSCALE_ENABLED", True)
+    monkeypatch.setattr(image_pipeline, "IMAGE_DOWNSCALE_MIN_BYTES", 0)
+    monkeypatch.setattr(image_pipeline, "IMAGE_MAX_DIMENSION", 256)
+    out = io.BytesIO()
+    Image.effect_noise((2000, 1500), 64).convert("RGB").save(out, format="PNG")
+    before = image_pipeline.stats()
+
+    try:
+        result, filename = await image_pipeline.prepare_for_upload(out.getvalue(), "image.png")
+    finally:
+        image_pipeline.shutdown_executor()
+
+    with Image.open(io.BytesIO(result)) as image:
+        assert max(image.size) == 256
+        assert image.format == "JPEG"
+    assert filename == "image.jpg"
+    assert image_pipeline.stats()["bytes_saved"] - before["bytes_saved"] == len(out.getvalue()) - len(result)
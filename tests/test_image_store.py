@@ -0,0 +1,120 @@
+from collections import OrderedDict
+
+import pytest
+
+from activities import image_store
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def empty_store(monkeypatch):
+    """Run every test against an empty store with fresh counters."""
+    monkeypatch.setattr(image_store, "_store", OrderedDict())
+    monkeypatch.setattr(image_store, "_deadlines", [])
+    monkeypatch.setattr(image_store, "_lost", OrderedDict())
+    monkeypatch.setattr(image_store, "_stats", dict.fromkeys(image_store._stats, 0))
+    monkeypatch.setattr(image_store, "_backend", None)
+    monkeypatch.setattr(image_store, "_gc_task", None)
+    monkeypatch.setattr(image_store, "IMAGE_STORE_BACKEND", "memory")
+
+
+@pytest.fixture
+def disk_store(monkeypatch, tmp_path):
+    """Switch the store to the disk backend in a temporary directory."""
+    monkeypatch.setattr(image_store, "IMAGE_STORE_BACKEND", "disk")
+    monkeypatch.setattr(image_store, "IMAGE_STORE_DIR", str(tmp_path))
+    return tmp_path
+
+
+async def test_put_keeps_raw_bytes_without_copying():
+    """Verify the store hands back a read-only view over the very buffer it was given."""
+    buffer = bytearray(b"\xff\xd8jpeg")
+    key = await image_store.put(buffer)
+
+    view = await image_store.get(key)
+
+    assert view.readonly
+    assert view.obj is buffer
+    assert bytes(view) == b"\xff\xd8jpeg"
+
+
+async def test_get_consumes_the_key():
+    """Verify an image can only be taken out once and unknown keys return None."""
+    key = await image_store.put(b"data")
+
+    assert await image_store.get(key) is not None
+    assert await image_store.get(key) is None
+    assert await image_store.get(None) is None
+
+
+async def test_byte_budget_evicts_oldest_and_reports_it(monkeypatch):
+    """Verify images over the byte budget evict the oldest ones and a late get() says so."""
+    monkeypatch.setattr(image_store, "MAX_BYTES", 10)
+    first = await image_store.put(b"a" * 4)
+    second = await image_store.put(b"b" * 4)
+    third = await image_store.put(b"c" * 4)
+
+    with pytest.raises(image_store.ImageEvictedError):
+        await image_store.get(first)
+    assert bytes(await image_store.get(second)) == b"bbbb"
+    assert bytes(await image_store.get(third)) == b"cccc"
+
+    stats = image_store.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["bytes_held"] == 0
+
+
+async def test_expired_images_are_reported(monkeypatch):
+    """Verify an image past its TTL is dropped on the next access and reported as expired."""
+    monkeypatch.setattr(image_store, "TTL_SECONDS", 60)
+    now = [1000.0]
+    monkeypatch.setattr(image_store.time, "monotonic", lambda: now[0])
+    key = await image_store.put(b"data")
+    now[0] += 61
+
+    with pytest.raises(image_store.ImageEvictedError, match="expired"):
+        await image_store.get(key)
+    assert image_store.stats()["expirations"] == 1
+
+
+async def test_disk_backend_serves_keys_from_other_workers(disk_store):
+    """Verify a key written by one worker resolves from the shared directory on another."""
+    key = await image_store.put(b"\xff\xd8photo")
+
+    # Simulate another worker process: nothing in memory, only the shared directory
+    image_store._store.clear()
+    image_store._backend = None
+
+    assert bytes(await image_store.get(key)) == b"\xff\xd8photo"
+    assert image_store.stats()["disk_reads"] == 1
+    assert not list(disk_store.rglob(".tmp-*"))
+
+
+async def test_disk_backend_is_content_addressed(disk_store):
+    """Verify the same image stored twice is one file and both keys resolve."""
+    first = await image_store.put(b"same image")
+    second = await image_store.put(b"same image")
+
+    assert first == second
+    assert len([p for p in disk_store.rglob("*") if p.is_file()]) == 1
+    assert bytes(await image_store.get(first)) == b"same image"
+    assert bytes(await image_store.get(second)) == b"same image"
+
+
+async def test_disk_backend_gc_removes_expired_files(disk_store, monkeypatch):
+    """Verify files past the TTL are garbage collected and reported as expired."""
+    key = await image_store.put(b"old image")
+    image_store._store.clear()
+    monkeypatch.setattr(image_store, "GC_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(image_store.get_backend(), "ttl_seconds", -1)
+
+    await image_store.put(b"new image")
+    # The sweep runs in the background; wait for it before looking
+    await image_store._gc_task
+
+    with pytest.raises(image_store.ImageEvictedError):
+        await image_store.get(key)
+    assert image_store.stats()["disk_expirations"] >= 1
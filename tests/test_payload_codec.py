@@ -0,0 +1,53 @@
+import pytest
+import temporalio.converter
+
+import payload_codec
+from payload_codec import ZLIB_ENCODING, CompressionCodec, get_data_converter
+
+pytestmark = pytest.mark.asyncio
+
+TEXT = "Новини AI дня: " + " ".join(f"message {i} about quality engineering" for i in range(100))
+
+
+async def test_large_payloads_round_trip_compressed():
+    """Verify payloads over the threshold are compressed and decode back to the original."""
+    codec = CompressionCodec("zlib", threshold=1024)
+    payloads = temporalio.converter.default().payload_converter.to_payloads([TEXT, {"ok": True}])
+
+    encoded = await codec.encode(payloads)
+
+    assert encoded[0].metadata["encoding"] == ZLIB_ENCODING
+    assert len(encoded[0].data) < len(payloads[0].SerializeToString())
+    # Small payloads stay as plain JSON
+    assert encoded[1] == payloads[1]
+    assert await codec.decode(encoded) == payloads
+
+
+async def test_uncompressed_history_still_decodes():
+    """Verify payloads written before compression was enabled, or with it off, pass through."""
+    plain = temporalio.converter.default().payload_converter.to_payloads([TEXT])
+
+    assert await CompressionCodec("zlib").decode(plain) == plain
+    assert await CompressionCodec(None).encode(plain) == plain
+
+
+async def test_data_converter_round_trip(monkeypatch):
+    """Verify the configured data converter turns values into compressed payloads and back."""
+    monkeypatch.setattr("payload_codec.TEMPORAL_PAYLOAD_COMPRESSION", "zlib")
+    converter = get_data_converter()
+
+    payloads = await converter.encode([TEXT, 1004])
+
+    assert payloads[0].metadata["encoding"] == ZLIB_ENCODING
+    assert await converter.decode(payloads, [str, int]) == [TEXT, 1004]
+
+
+async def test_missing_zstandard_falls_back_to_zlib_with_a_warning(monkeypatch, caplog):
+    """Verify asking for zstd without the package logs a warning and compresses with zlib."""
+    monkeypatch.setattr(payload_codec, "zstandard", None)
+
+    with caplog.at_level("WARNING", logger="payload_codec"):
+        codec = CompressionCodec("zstd")
+
+    assert codec.algorithm == "zlib"
+    assert "zstandard is not installed" in caplog.text
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from workflows import telegram_to_slack_workflow
+from workflows.telegram_to_slack_workflow import DEFAULT_OPTIONS, _ChannelPipeline
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Drive workflow.now() from a list holding the current time in minutes."""
+    minutes = [0.0]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    monkeypatch.setattr(telegram_to_slack_workflow.workflow, "now", lambda: start + timedelta(minutes=minutes[0]))
+    return minutes
+
+
+def test_cold_start_drain_keeps_the_default_interval(clock):
+    """Verify the immediate re-poll after a full first fetch doesn't push the channel out to the maximum."""
+    pipeline = _ChannelPipeline()
+
+    pipeline._record_poll("@chan", DEFAULT_OPTIONS["fetch_limit"])
+    clock[0] += 0.05
+    pipeline._record_poll("@chan", 0)
+
+    assert pipeline.schedule["@chan"]["interval"] == DEFAULT_OPTIONS["poll_interval_minutes"]
+
+
+def test_quick_repolls_are_counted_over_the_full_window(clock):
+    """Verify a post picked up seconds after the last poll doesn't pin the interval to the minimum."""
+    pipeline = _ChannelPipeline()
+    pipeline._record_poll("@chan", 0)
+
+    clock[0] += 0.1
+    pipeline._record_poll("@chan", 1)
+    assert pipeline.schedule["@chan"]["interval"] == 3
+
+    clock[0] += 3
+    pipeline._record_poll("@chan", 0)
+    assert 2.5 < pipeline.schedule["@chan"]["interval"] < 3.5
+
+
+def test_interval_moves_at_most_twofold_per_update(clock):
+    """Verify a silent channel backs off gradually and a burst speeds polling up gradually."""
+    pipeline = _ChannelPipeline()
+    pipeline._record_poll("@quiet", 0)
+    pipeline._record_poll("@busy", 0)
+
+    clock[0] += 3
+    pipeline._record_poll("@quiet", 0)
+    pipeline._record_poll("@busy", 30)
+
+    assert pipeline.schedule["@quiet"]["interval"] <= 6
+    assert pipeline.schedule["@busy"]["interval"] >= 1.5
@@ -0,0 +1,37 @@
+import pytest
+from aiohttp import web
+
+from activities import slack_client
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_shared_session_reuses_connections():
+    """Verify repeated requests go through one session and reuse its keep-alive connection."""
+    async def ok(request):
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/", ok)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        before = slack_client.connection_stats()
+        session = await slack_client.get_session()
+        assert await slack_client.get_session() is session
+
+        for _ in range(3):
+            async with session.get(f"http://127.0.0.1:{port}/") as resp:
+                assert await resp.text() == "ok"
+
+        stats = slack_client.connection_stats()
+        assert stats["requests"] - before["requests"] == 3
+        assert stats["connections_created"] - before["connections_created"] == 1
+        assert stats["connections_reused"] - before["connections_reused"] == 2
+    finally:
+        await slack_client.shutdown_client()
+        await runner.cleanup()
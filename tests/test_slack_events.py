@@ -0,0 +1,130 @@
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+
+from activities.slack_approval_activities import slack_events
+from activities.slack_approval_activities.slack_events import SLACK_EVENTS_PATH, create_app
+
+pytestmark = pytest.mark.asyncio
+
+SIGNING_SECRET = "test-secret"
+
+
+def reaction_added(reaction: str, item_type: str = "message") -> dict:
+    """Build a reaction_added event payload as Slack delivers it."""
+    return {
+        "type": "event_callback",
+        "event": {
+            "type": "reaction_added",
+            "user": "U123",
+            "reaction": reaction,
+            "item": {"type": item_type, "channel": "C09R8GCL2K1", "ts": "1700000000.000100"},
+            "event_ts": "1700000001.000200",
+        },
+    }
+
+
+def signed_headers(body: bytes, secret: str = SIGNING_SECRET) -> dict:
+    """Sign a request body the way Slack does."""
+    timestamp = str(int(time.time()))
+    signature = "v0=" + hmac.new(
+        secret.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256
+    ).hexdigest()
+    return {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": signature,
+        "Content-Type": "application/json",
+    }
+
+
+@pytest_asyncio.fixture
+async def receiver():
+    """Run the events app against a fake signaller that records approvals."""
+    signals = []
+
+    async def fake_signal(channel_id, ts):
+        signals.append((channel_id, ts))
+
+    client = TestClient(TestServer(create_app(fake_signal, SIGNING_SECRET)))
+    await client.start_server()
+    yield client, signals
+    await client.close()
+
+
+async def replay(client, payload, secret=SIGNING_SECRET):
+    """POST an event payload to the receiver and return the response."""
+    body = json.dumps(payload).encode()
+    return await client.post(SLACK_EVENTS_PATH, data=body, headers=signed_headers(body, secret))
+
+
+async def test_url_verification_returns_challenge(receiver):
+    """Verify the URL verification handshake echoes the challenge."""
+    client, signals = receiver
+
+    resp = await replay(client, {"type": "url_verification", "challenge": "abc123"})
+
+    assert resp.status == 200
+    assert (await resp.json()) == {"challenge": "abc123"}
+    assert signals == []
+
+
+async def test_white_check_mark_signals_approval(receiver):
+    """Verify a white_check_mark reaction signals the workflow with channel and ts."""
+    client, signals = receiver
+
+    resp = await replay(client, reaction_added("white_check_mark"))
+
+    assert resp.status == 200
+    assert signals == [("C09R8GCL2K1", "1700000000.000100")]
+
+
+async def test_other_reactions_are_ignored(receiver):
+    """Verify other reactions and reactions on files don't signal anything."""
+    client, signals = receiver
+
+    await replay(client, reaction_added("eyes"))
+    await replay(client, reaction_added("white_check_mark", item_type="file"))
+
+    assert signals == []
+
+
+async def test_bad_signature_is_rejected(receiver):
+    """Verify requests signed with the wrong secret are rejected."""
+    client, signals = receiver
+
+    resp = await replay(client, reaction_added("white_check_mark"), secret="wrong-secret")
+
+    assert resp.status == 401
+    assert signals == []
+
+
+async def test_receiver_refuses_to_start_without_signing_secret(monkeypatch):
+    """Verify the endpoint is never exposed when there is no secret to verify requests with."""
+    monkeypatch.setattr(slack_events, "SLACK_SIGNING_SECRET", "")
+
+    with pytest.raises(RuntimeError, match="SLACK_SIGNING_SECRET"):
+        await slack_events.start_event_receiver(temporal_client=None)
+    assert slack_events._runner is None
+
+
+async def test_app_without_secret_rejects_everything():
+    """Verify an app built without a secret rejects requests instead of skipping verification."""
+    signals = []
+
+    async def fake_signal(channel_id, ts):
+        signals.append((channel_id, ts))
+
+    client = TestClient(TestServer(create_app(fake_signal, "")))
+    await client.start_server()
+    try:
+        resp = await replay(client, reaction_added("white_check_mark"))
+    finally:
+        await client.close()
+
+    assert resp.status == 401
+    assert signals == []
@@ -0,0 +1,107 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from activities import slack_client, slack_upload
+from activities.slack_upload import find_share_ts
+
+
+def test_find_share_ts_reads_public_and_private_shares():
+    """Verify the share message ts is found in either public or private shares."""
+    public = {"shares": {"public": {"C1": [{"ts": "1700000000.000100"}]}}}
+    private = {"shares": {"private": {"G1": [{"ts": "1700000000.000200"}]}}}
+
+    assert find_share_ts(public) == "1700000000.000100"
+    assert find_share_ts(private) == "1700000000.000200"
+
+
+def test_find_share_ts_without_shares():
+    """Verify a file that is not shared yet has no ts."""
+    assert find_share_ts({}) is None
+    assert find_share_ts({"shares": {"public": {"C1": []}}}) is None
+
+
+@pytest_asyncio.fixture
+async def fake_slack_api(monkeypatch):
+    """Run a local fake of the Slack upload endpoints; files.info reports the share on its Nth call."""
+    state = {"files_info_calls": 0, "shared_after": 2, "uploaded": b"", "sleeps": []}
+
+    async def get_upload_url(request):
+        return web.json_response({"ok": True, "upload_url": f"{base}/upload", "file_id": "F1"})
+
+    async def upload(request):
+        state["uploaded"] = await request.read()
+        return web.Response(text="OK")
+
+    async def complete(request):
+        body = await request.json()
+        state["complete_body"] = body
+        return web.json_response({"ok": True, "files": [{"id": "F1", "title": body["files"][0]["title"]}]})
+
+    async def files_info(request):
+        state["files_info_calls"] += 1
+        file_obj = {"id": request.query["file"]}
+        if state["files_info_calls"] >= state["shared_after"]:
+            file_obj["shares"] = {"public": {"C1": [{"ts": "1700000000.000300"}]}}
+        return web.json_response({"ok": True, "file": file_obj})
+
+    async def fake_sleep(seconds):
+        state["sleeps"].append(seconds)
+
+    app = web.Application()
+    app.router.add_get("/files.getUploadURLExternal", get_upload_url)
+    app.router.add_post("/upload", upload)
+    app.router.add_post("/files.completeUploadExternal", complete)
+    app.router.add_get("/files.info", files_info)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    monkeypatch.setattr(slack_upload, "SLACK_API_URL", base)
+    monkeypatch.setattr(slack_upload.asyncio, "sleep", fake_sleep)
+    yield state
+
+    await slack_client.shutdown_client()
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_upload_file_polls_for_share_ts_with_backoff(fake_slack_api):
+    """Verify the three upload steps run, files.info is retried until shared, and each step is timed."""
+    result = await slack_upload.upload_file(
+        b"image-bytes", token="xoxb-test", channel_id="C1", initial_comment="hi", want_message_ts=True
+    )
+
+    assert fake_slack_api["uploaded"] == b"image-bytes"
+    assert fake_slack_api["complete_body"]["channel_id"] == "C1"
+    assert result["message_ts"] == "1700000000.000300"
+    assert fake_slack_api["files_info_calls"] == 2
+    assert fake_slack_api["sleeps"] == [slack_upload.SHARE_TS_INITIAL_DELAY]
+    assert set(result["timings"]) == {"get_upload_url", "upload", "complete", "share_ts"}
+
+
+@pytest.mark.asyncio
+async def test_upload_file_share_ts_wait_is_capped(fake_slack_api, monkeypatch):
+    """Verify the files.info backoff gives up without sleeping more than SHARE_TS_MAX_WAIT in total."""
+    fake_slack_api["shared_after"] = 1000
+    monkeypatch.setattr(slack_upload, "SHARE_TS_MAX_ATTEMPTS", 20)
+
+    result = await slack_upload.upload_file(
+        b"image-bytes", token="xoxb-test", channel_id="C1", initial_comment="hi", want_message_ts=True
+    )
+
+    assert result["message_ts"] is None
+    assert sum(fake_slack_api["sleeps"]) == pytest.approx(slack_upload.SHARE_TS_MAX_WAIT)
+    assert fake_slack_api["sleeps"][:2] == [0.25, 0.5]
+
+
+@pytest.mark.asyncio
+async def test_upload_file_skips_files_info_when_not_needed(fake_slack_api):
+    """Verify files.info is not polled when the caller doesn't need the share ts."""
+    result = await slack_upload.upload_file(b"image-bytes", token="xoxb-test", channel_id="C1", initial_comment="hi")
+
+    assert result["message_ts"] is None
+    assert fake_slack_api["files_info_calls"] == 0
+    assert "share_ts" not in result["timings"]
@@ -0,0 +1,46 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from temporalio.testing import ActivityEnvironment
+
+from activities.telegram_to_slack_activities import telegram_get_messeges
+from activities.telegram_to_slack_activities.telegram_get_messeges import fetch_last_message
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeTelegramClient:
+    """Serves a channel's posts the way Telethon's iter_messages orders and limits them."""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.calls = []
+        self.get_entity = AsyncMock(return_value="channel-entity")
+
+    async def iter_messages(self, entity, limit, min_id=0, reverse=False):
+        self.calls.append({"limit": limit, "min_id": min_id, "reverse": reverse})
+        ids = sorted((i for i in self.ids if i > min_id), reverse=not reverse)
+        for msg_id in ids[:limit]:
+            yield MagicMock(id=msg_id, date=datetime(2026, 1, 1, tzinfo=timezone.utc), text=f"post {msg_id}", photo=None)
+
+
+async def test_backlog_is_fetched_oldest_first_from_last_id():
+    """Verify a backlog after the last processed id starts at its oldest post, not its newest."""
+    client = FakeTelegramClient(range(1, 21))
+
+    with patch.object(telegram_get_messeges, "get_client", AsyncMock(return_value=client)):
+        messages = await ActivityEnvironment().run(fetch_last_message, "@channel", 5, 10)
+
+    assert [m["id"] for m in messages] == [11, 12, 13, 14, 15]
+    assert client.calls[0]["reverse"] is True
+
+
+async def test_first_fetch_returns_latest_posts_in_order():
+    """Verify a channel with no last processed id starts from its latest posts, oldest to newest."""
+    client = FakeTelegramClient(range(1, 21))
+
+    with patch.object(telegram_get_messeges, "get_client", AsyncMock(return_value=client)):
+        messages = await ActivityEnvironment().run(fetch_last_message, "@channel", 5, 0)
+
+    assert [m["id"] for m in messages] == [16, 17, 18, 19, 20]
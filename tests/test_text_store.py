@@ -0,0 +1,29 @@
+import pytest
+from temporalio.exceptions import ApplicationError
+
+from activities import text_store
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_round_trip_and_passthrough():
+    """Verify references resolve to their text and plain texts pass through unchanged."""
+    ref = await text_store.put("Привіт, світ")
+
+    assert text_store.is_ref(ref)
+    assert await text_store.resolve(ref) == "Привіт, світ"
+    # Reading doesn't consume the text, so retries resolve it again
+    assert await text_store.resolve(ref) == "Привіт, світ"
+    assert await text_store.resolve("plain text") == "plain text"
+    assert await text_store.put("") == ""
+
+
+async def test_expired_reference_is_not_retryable(monkeypatch):
+    """Verify an expired reference fails the activity without retries."""
+    ref = await text_store.put("short-lived")
+    now = text_store.time.monotonic()
+    monkeypatch.setattr(text_store.time, "monotonic", lambda: now + text_store.image_store.TTL_SECONDS + 1)
+
+    with pytest.raises(ApplicationError) as error:
+        await text_store.resolve(ref)
+    assert error.value.non_retryable
@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+
+from activities.telegram_to_slack_activities.translation_cache import (
+    TranslationCache,
+    make_key,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Return a path for a throwaway SQLite cache file."""
+    return str(tmp_path / "cache.sqlite3")
+
+
+async def test_make_key_ignores_whitespace_differences():
+    """Verify reposts that only differ in spacing share a key, but prompt/model changes don't."""
+    key = make_key("AI news  of the day \n", "1", "model-a")
+
+    assert key == make_key("  AI news of the day", "1", "model-a")
+    assert key != make_key("AI news of the day", "2", "model-a")
+    assert key != make_key("AI news of the day", "1", "model-b")
+
+
+async def test_entries_survive_reopening(cache_path):
+    """Verify cached results are persisted across cache instances (worker restarts)."""
+    cache = TranslationCache(cache_path)
+    await cache.put("k", "VALID", "Hello")
+    cache.close()
+
+    reopened = TranslationCache(cache_path)
+    assert await reopened.get("k") == ("VALID", "Hello")
+    reopened.close()
+
+
+async def test_get_or_compute_counts_hits_and_misses(cache_path):
+    """Verify the second lookup is served from the cache and reflected in the stats."""
+    cache = TranslationCache(cache_path)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "INVALID", ""
+
+    assert await cache.get_or_compute("k", compute) == ("INVALID", "")
+    assert await cache.get_or_compute("k", compute) == ("INVALID", "")
+
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    cache.close()
+
+
+async def test_concurrent_identical_requests_are_merged(cache_path):
+    """Verify concurrent lookups for the same key trigger only one computation."""
+    cache = TranslationCache(cache_path)
+    calls = []
+    release = asyncio.Event()
+
+    async def compute():
+        calls.append(1)
+        await release.wait()
+        return "VALID", "Translated"
+
+    tasks = [asyncio.create_task(cache.get_or_compute("k", compute)) for _ in range(3)]
+    await asyncio.sleep(0.1)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == [("VALID", "Translated")] * 3
+    assert len(calls) == 1
+    assert cache.stats()["merged"] == 2
+    cache.close()
+
+
+async def test_expired_entries_are_dropped(cache_path):
+    """Verify entries older than the TTL are treated as misses."""
+    cache = TranslationCache(cache_path, ttl_seconds=0)
+    await cache.put("k", "VALID", "Hello")
+    await asyncio.sleep(0.01)
+
+    assert await cache.get("k") is None
+    cache.close()
+
+
+async def test_size_limit_evicts_least_recently_used(cache_path):
+    """Verify the least recently accessed entry is evicted once the size limit is exceeded."""
+    cache = TranslationCache(cache_path, max_entries=2)
+    await cache.put("a", "VALID", "A")
+    await cache.put("b", "VALID", "B")
+    await cache.get("a")
+    await cache.put("c", "VALID", "C")
+
+    assert await cache.get("a") == ("VALID", "A")
+    assert await cache.get("b") is None
+    assert await cache.get("c") == ("VALID", "C")
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+async def test_batch_lookups_merge_with_single_ones_and_each_other(cache_path):
+    """Verify a batch computes each distinct missing key once and waits on keys already in flight."""
+    cache = TranslationCache(cache_path)
+    await cache.put("cached", "VALID", "Cached")
+    release = asyncio.Event()
+    batches = []
+
+    async def compute_single():
+        await release.wait()
+        return "VALID", "Single"
+
+    async def compute_many(keys):
+        batches.append(keys)
+        return {key: ("VALID", key.upper()) for key in keys}
+
+    single = asyncio.create_task(cache.get_or_compute("inflight", compute_single))
+    await asyncio.sleep(0.1)
+    batch = asyncio.create_task(
+        cache.get_or_compute_many(["new", "cached", "inflight", "new"], compute_many)
+    )
+    await asyncio.sleep(0.1)
+    release.set()
+
+    assert await single == ("VALID", "Single")
+    assert await batch == {"new": ("VALID", "NEW"), "cached": ("VALID", "Cached"), "inflight": ("VALID", "Single")}
+    assert batches == [["new"]]
+    assert cache.stats()["merged"] == 1
+    assert await cache.get("new") == ("VALID", "NEW")
+    cache.close()
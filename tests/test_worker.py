@@ -0,0 +1,32 @@
+import pytest
+
+import worker
+
+
+def test_parse_queues_defaults_to_every_queue(monkeypatch):
+    """Verify a worker with no selection serves every queue, whatever the image store backend."""
+    monkeypatch.delenv("WORKER_QUEUES", raising=False)
+    monkeypatch.setattr("sys.argv", ["worker.py"])
+    monkeypatch.setattr(worker, "IMAGE_STORE_BACKEND", "memory")
+
+    assert worker.parse_queues() == list(worker.TASK_QUEUES)
+
+
+def test_parse_queues_refuses_split_activities_with_memory_store(monkeypatch):
+    """Verify serving only some activity queues is refused unless the image store is on disk."""
+    monkeypatch.setattr("sys.argv", ["worker.py", "--queues", "workflows,telegram"])
+    monkeypatch.setattr(worker, "IMAGE_STORE_BACKEND", "memory")
+
+    with pytest.raises(SystemExit):
+        worker.parse_queues()
+
+    monkeypatch.setattr(worker, "IMAGE_STORE_BACKEND", "disk")
+    assert worker.parse_queues() == ["workflows", "telegram"]
+
+
+def test_parse_queues_allows_workflows_only_process(monkeypatch):
+    """Verify splitting off just the workflows queue keeps all activities together and is allowed."""
+    monkeypatch.setattr("sys.argv", ["worker.py", "--queues", "llm,telegram,slack"])
+    monkeypatch.setattr(worker, "IMAGE_STORE_BACKEND", "memory")
+
+    assert worker.parse_queues() == ["llm", "telegram", "slack"]
@@ -0,0 +1,104 @@
+import base64
+import json
+
+import pytest
+from temporalio.client import WorkflowHistory
+from temporalio.worker import Replayer
+
+from workflows.slack_approval_workflow import PollSlackForReactionWorkflow
+from workflows.telegram_to_slack_workflow import TelegramMonitorWorkflow
+
+pytestmark = pytest.mark.asyncio
+
+
+def _payload(value):
+    """Encode a value the way the default data converter stores it in history."""
+    return {
+        "metadata": {"encoding": base64.b64encode(b"json/plain").decode()},
+        "data": base64.b64encode(json.dumps(value).encode()).decode(),
+    }
+
+
+class _History:
+    """Builds the history a workflow run wrote before its code changed, one activity at a time."""
+
+    def __init__(self, workflow_type: str, pollstate) -> None:
+        self.events = []
+        self._add("WORKFLOW_EXECUTION_STARTED", {
+            "workflowType": {"name": workflow_type},
+            "taskQueue": {"name": "multi-task-queue"},
+            "input": {"payloads": [_payload(pollstate)]},
+            "workflowTaskTimeout": "10s",
+            "originalExecutionRunId": "run-1",
+            "firstExecutionRunId": "run-1",
+            "attempt": 1,
+        })
+        self._workflow_task()
+
+    def _add(self, event_type: str, attributes: dict) -> str:
+        """Append one event and return its id."""
+        event_id = str(len(self.events) + 1)
+        key = "".join(part.capitalize() for part in event_type.lower().split("_"))
+        self.events.append({
+            "eventId": event_id,
+            "eventTime": "2026-01-01T00:00:00Z",
+            "eventType": f"EVENT_TYPE_{event_type}",
+            f"{key[0].lower()}{key[1:]}EventAttributes": attributes,
+        })
+        return event_id
+
+    def _workflow_task(self) -> None:
+        """Append a scheduled, started and completed workflow task."""
+        scheduled = self._add("WORKFLOW_TASK_SCHEDULED", {"taskQueue": {"name": "multi-task-queue"}, "attempt": 1})
+        started = self._add("WORKFLOW_TASK_STARTED", {"scheduledEventId": scheduled})
+        self._completed_task = self._add(
+            "WORKFLOW_TASK_COMPLETED", {"scheduledEventId": scheduled, "startedEventId": started}
+        )
+
+    def activity(self, name: str, result) -> "_History":
+        """Append a completed activity and the workflow task that handled its result."""
+        scheduled = self._add("ACTIVITY_TASK_SCHEDULED", {
+            "activityId": str(sum(e["eventType"] == "EVENT_TYPE_ACTIVITY_TASK_SCHEDULED" for e in self.events) + 1),
+            "activityType": {"name": name},
+            "taskQueue": {"name": "multi-task-queue"},
+            "scheduleToCloseTimeout": "60s",
+            "workflowTaskCompletedEventId": self._completed_task,
+        })
+        started = self._add("ACTIVITY_TASK_STARTED", {"scheduledEventId": scheduled, "attempt": 1})
+        self._add("ACTIVITY_TASK_COMPLETED", {
+            "scheduledEventId": scheduled,
+            "startedEventId": started,
+            "result": {"payloads": [_payload(result)]},
+        })
+        self._workflow_task()
+        return self
+
+    async def replay(self, *workflows) -> None:
+        """Replay the history against the current code, failing on any nondeterminism."""
+        history = WorkflowHistory.from_json("replay-test", {"events": self.events})
+        await Replayer(workflows=list(workflows)).replay_workflow(history)
+
+
+async def test_approval_runs_from_before_the_bulk_sweep_still_replay():
+    """Verify a run that used get_messages/check_reactions per message replays on the current code."""
+    history = (
+        _History("PollSlackForReactionWorkflow", ["C1", [], 0])
+        .activity("get_messages", ["1.0", "2.0"])
+        .activity("check_reactions", {"ts": "1.0", "text": "a", "reactions": [{"name": "white_check_mark"}]})
+        .activity("resend_message", None)
+        .activity("check_reactions", {"ts": "2.0", "text": "b", "reactions": []})
+    )
+
+    await history.replay(PollSlackForReactionWorkflow)
+
+
+async def test_monitor_runs_from_before_the_channel_pipeline_still_replay():
+    """Verify a run of the sequential monitor loop replays on the current code."""
+    history = (
+        _History("TelegramMonitorWorkflow", [["@channel"], {}, 0])
+        .activity("fetch_last_message", [{"id": 7, "date": "2026-01-01T00:00:00", "text": "post", "has_image": False}])
+        .activity("get_claude_answer_activity", "post")
+        .activity("send_message_to_slack", None)
+    )
+
+    await history.replay(TelegramMonitorWorkflow)
@@ -0,0 +1,220 @@
+import asyncio
+import uuid
+from contextlib import AsyncExitStack
+
+import pytest
+import pytest_asyncio
+from temporalio import activity
+from temporalio.api.enums.v1 import EventType
+from temporalio.client import WorkflowExecutionStatus
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from task_queues import TASK_QUEUES
+from workflows.slack_approval_workflow import PollSlackForReactionWorkflow
+from workflows.telegram_to_slack_workflow import (
+    TelegramChannelWorkflow,
+    TelegramMonitorWorkflow,
+    TelegramSupervisorWorkflow,
+    channel_workflow_id,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def env():
+    """Start Temporal's time-skipping test server, or skip when it can't be downloaded or run."""
+    try:
+        environment = await WorkflowEnvironment.start_time_skipping()
+    except RuntimeError as e:
+        pytest.skip(f"Temporal test server unavailable: {e}")
+    yield environment
+    await environment.shutdown()
+
+
+class FakeChannel:
+    """Mocked activities serving one Telegram channel's posts and recording what reaches Slack."""
+
+    def __init__(self, ids, translate_delays=None) -> None:
+        self.ids = list(ids)
+        self.translate_delays = translate_delays or {}
+        self.fetch_min_ids = []
+        self.batches = []
+        self.posted = []
+        self.translating = 0
+        self.max_translating = 0
+
+    def activities(self):
+        """Return the mocked activities grouped by the task queue they are served on."""
+
+        @activity.defn(name="fetch_last_message")
+        async def fetch_last_message(channel, limit=5, min_id=0, by_reference=False):
+            self.fetch_min_ids.append(min_id)
+            return [
+                {"id": msg_id, "date": "2026-01-01T00:00:00", "text": f"post {msg_id}", "has_image": False, "media": None}
+                for msg_id in self.ids if msg_id > min_id
+            ][:limit]
+
+        @activity.defn(name="get_claude_answer_activity")
+        async def get_claude_answer_activity(text):
+            self.translating += 1
+            self.max_translating = max(self.max_translating, self.translating)
+            try:
+                await asyncio.sleep(self.translate_delays.get(text, 0))
+            finally:
+                self.translating -= 1
+            return f"translated {text}"
+
+        @activity.defn(name="get_claude_answers_batch_activity")
+        async def get_claude_answers_batch_activity(texts):
+            self.batches.append(texts)
+            return [await get_claude_answer_activity(text) for text in texts]
+
+        @activity.defn(name="send_message_to_slack")
+        async def send_message_to_slack(info):
+            self.posted.append(info[4])
+
+        return {
+            "telegram": [fetch_last_message],
+            "llm": [get_claude_answer_activity, get_claude_answers_batch_activity],
+            "slack": [send_message_to_slack],
+        }
+
+
+async def _start_workers(stack: AsyncExitStack, env: WorkflowEnvironment, fake: FakeChannel) -> None:
+    """Run the real workflows and the mocked activities on their usual task queues."""
+    await stack.enter_async_context(Worker(
+        env.client,
+        task_queue=TASK_QUEUES["workflows"],
+        workflows=[TelegramMonitorWorkflow, TelegramSupervisorWorkflow, TelegramChannelWorkflow, PollSlackForReactionWorkflow],
+    ))
+    for queue, activities in fake.activities().items():
+        await stack.enter_async_context(Worker(env.client, task_queue=TASK_QUEUES[queue], activities=activities))
+
+
+async def _eventually(condition, timeout: float = 30.0) -> None:
+    """Wait until an (optionally async) condition holds, failing the test after `timeout` seconds."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        result = condition()
+        if asyncio.iscoroutine(result):
+            result = await result
+        if result:
+            return
+        await asyncio.sleep(0.1)
+    pytest.fail("condition not reached in time")
+
+
+async def test_supervisor_restarts_failed_child_from_its_checkpoint(env):
+    """Verify a child that dies is restarted and resumes after the last id it reported."""
+    fake = FakeChannel([11])
+    supervisor_id = f"tg-supervisor-{uuid.uuid4()}"
+
+    async with AsyncExitStack() as stack:
+        await _start_workers(stack, env, fake)
+        supervisor = await env.client.start_workflow(
+            TelegramSupervisorWorkflow.run,
+            [["@chan"], {"@chan": 10}, 0, {"restart_delay_seconds": 1, "checkpoint_minutes": 0}],
+            id=supervisor_id,
+            task_queue=TASK_QUEUES["workflows"],
+        )
+
+        async def progress_reported():
+            async for event in supervisor.fetch_history_events():
+                if event.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_SIGNALED and \
+                        event.workflow_execution_signaled_event_attributes.signal_name == "channel_progress":
+                    return True
+            return False
+
+        await _eventually(lambda: fake.posted == [11])
+        await _eventually(progress_reported)
+
+        # Kill the child; the supervisor has to notice and start a new one
+        await env.client.get_workflow_handle(channel_workflow_id(supervisor_id, "@chan")).terminate(reason="test failure")
+
+        await _eventually(lambda: len(fake.fetch_min_ids) >= 2)
+        assert fake.fetch_min_ids[0] == 10
+        assert fake.fetch_min_ids[-1] == 11
+        assert fake.posted == [11]
+
+        await supervisor.terminate(reason="test done")
+
+
+async def test_supervisor_rollover_keeps_children_running(env):
+    """Verify the supervisor continues as new without stopping or restarting its children."""
+    fake = FakeChannel([11])
+    supervisor_id = f"tg-supervisor-{uuid.uuid4()}"
+
+    async with AsyncExitStack() as stack:
+        await _start_workers(stack, env, fake)
+        supervisor = await env.client.start_workflow(
+            TelegramSupervisorWorkflow.run,
+            [["@chan"], {"@chan": 10}, 0, {"max_history_events": 15}],
+            id=supervisor_id,
+            task_queue=TASK_QUEUES["workflows"],
+        )
+        first_run = (await supervisor.describe()).run_id
+        child = env.client.get_workflow_handle(channel_workflow_id(supervisor_id, "@chan"))
+        await _eventually(lambda: fake.posted == [11])
+        child_run = (await child.describe()).run_id
+
+        # Each signal adds to the supervisor's history until it continues as new
+        for _ in range(5):
+            await supervisor.signal(TelegramSupervisorWorkflow.add_channel, "@chan")
+
+        async def rolled_over():
+            return (await env.client.get_workflow_handle(supervisor_id).describe()).run_id != first_run
+
+        await _eventually(rolled_over)
+
+        # Stopping the child would have completed its run; it runs on, or continued as new itself
+        status = (await env.client.get_workflow_handle(child.id, run_id=child_run).describe()).status
+        assert status in (WorkflowExecutionStatus.RUNNING, WorkflowExecutionStatus.CONTINUED_AS_NEW)
+        assert fake.posted == [11]
+
+        await env.client.get_workflow_handle(supervisor_id).terminate(reason="test done")
+        await child.terminate(reason="test done")
+
+
+async def test_monitor_posts_in_order_with_pipelined_translations(env):
+    """Verify translations run ahead of the posts but messages still reach Slack in msg_id order."""
+    # The oldest message translates slowest, so translations finish in reverse order
+    fake = FakeChannel([1, 2, 3, 4], {"post 1": 0.6, "post 2": 0.4, "post 3": 0.2, "post 4": 0})
+
+    async with AsyncExitStack() as stack:
+        await _start_workers(stack, env, fake)
+        monitor = await env.client.start_workflow(
+            TelegramMonitorWorkflow.run,
+            [["@chan"], {}, 0, {"pipeline_depth": 3, "batch_threshold": 100}],
+            id=f"tg-monitor-{uuid.uuid4()}",
+            task_queue=TASK_QUEUES["workflows"],
+        )
+
+        await _eventually(lambda: len(fake.posted) == 4)
+
+        assert fake.posted == [1, 2, 3, 4]
+        assert fake.max_translating > 1
+
+        await monitor.terminate(reason="test done")
+
+
+async def test_monitor_pipelines_batches_of_a_backlog(env):
+    """Verify a backlog is translated in batch_size chunks and still posted in msg_id order."""
+    fake = FakeChannel([1, 2, 3, 4, 5], {"post 1": 0.3})
+
+    async with AsyncExitStack() as stack:
+        await _start_workers(stack, env, fake)
+        monitor = await env.client.start_workflow(
+            TelegramMonitorWorkflow.run,
+            [["@chan"], {}, 0, {"pipeline_depth": 2, "batch_threshold": 2, "batch_size": 2}],
+            id=f"tg-monitor-{uuid.uuid4()}",
+            task_queue=TASK_QUEUES["workflows"],
+        )
+
+        await _eventually(lambda: len(fake.posted) == 5)
+
+        assert fake.posted == [1, 2, 3, 4, 5]
+        assert sorted(fake.batches) == [["post 1", "post 2"], ["post 3", "post 4"], ["post 5"]]
+
+        await monitor.terminate(reason="test done")
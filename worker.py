@@ -1,52 +1,179 @@
 # run_worker.py
+import argparse
 import asyncio
 import os
 
 from temporalio.client import Client
 from temporalio.worker import Worker
 
-from workflows.telegram_to_slack_workflow import TelegramMonitorWorkflow
+from payload_codec import get_data_converter
+from task_queues import TASK_QUEUES, worker_limits
+from workflows.telegram_to_slack_workflow import (
+    TelegramChannelWorkflow,
+    TelegramMonitorWorkflow,
+    TelegramSupervisorWorkflow,
+)
 from activities.telegram_to_slack_activities.telegram_get_messeges import (
+    download_telegram_media,
     fetch_last_message,
     get_client as get_telegram_client,
     shutdown_client as shutdown_telegram_client,
 )
-from activities.telegram_to_slack_activities.claude_translate import get_claude_answer_activity
+from activities.telegram_to_slack_activities.claude_translate import (
+    get_claude_answer_activity,
+    get_claude_answers_batch_activity,
+    get_client as get_claude_client,
+    shutdown_client as shutdown_claude_client,
+)
+from activities.telegram_to_slack_activities.translation_cache import close_cache as close_translation_cache
+from activities.telegram_to_slack_activities.telegram_updates import (
+    TG_PUSH_INGESTION,
+    start_push_ingestion,
+    stop_push_ingestion,
+)
 from activities.telegram_to_slack_activities.send_message_to_slack import send_message_to_slack
 
 from workflows.slack_approval_workflow import PollSlackForReactionWorkflow
-from activities.slack_approval_activities.get_messages import get_messages
-from activities.slack_approval_activities.get_reactions import check_reactions
+from activities.slack_client import (
+    connection_stats as slack_connection_stats,
+    get_client as get_slack_client,
+    shutdown_client as shutdown_slack_client,
+)
+from activities.slack_approval_activities.slack_events import (
+    SLACK_EVENTS_ENABLED,
+    SLACK_EVENTS_PORT,
+    start_event_receiver,
+    stop_event_receiver,
+)
+from activities.slack_approval_activities.get_messages import get_messages, get_recent_messages
+from activities.slack_approval_activities.get_reactions import check_reactions, download_slack_image
 from activities.slack_approval_activities.resend_message import resend_message
+from activities.image_store import IMAGE_STORE_BACKEND, stats as image_store_stats
+from activities.image_pipeline import (
+    missing_dependency as image_pipeline_missing_dependency,
+    shutdown_executor as shutdown_image_pipeline,
+    stats as image_pipeline_stats,
+)
 
 
-async def main():
-    """Connect to Temporal server and run the worker with all registered workflows and activities."""
-    client = await Client.connect(os.getenv("TEMPORAL_ADDRESS", "localhost:7233"))
+# Activities served on each activity task queue
+QUEUE_ACTIVITIES = {
+    "llm": [get_claude_answer_activity, get_claude_answers_batch_activity],
+    "telegram": [fetch_last_message, download_telegram_media],
+    "slack": [send_message_to_slack, get_messages, get_recent_messages, check_reactions, download_slack_image, resend_message],
+}
 
-    # Pre-warm the shared Telegram client so the first activity invocation doesn't
-    # pay the auth-key + DC discovery cost on a tight Temporal timeout.
-    try:
-        await get_telegram_client()
-        print("Telegram client connected")
-    except Exception as e:
-        # Non-fatal: the activity will retry. Log and keep going so the worker still serves
-        # other workflows (slack approval) even if Telegram auth is misconfigured.
-        print(f"Telegram client pre-warm failed (will retry on first use): {e}")
-
-    worker = Worker(
-        client,
-        task_queue="multi-task-queue",
-        workflows=[TelegramMonitorWorkflow, PollSlackForReactionWorkflow],
-        activities=[fetch_last_message, get_claude_answer_activity, send_message_to_slack, get_messages, check_reactions, resend_message],
+# Activities that runs started before the task-queue split schedule on the workflows queue itself.
+# They are served there until every such run has continued as new onto the current code
+# (see CHANNEL_PIPELINE_PATCH and BULK_HISTORY_PATCH), and can be dropped after that.
+LEGACY_WORKFLOW_QUEUE_ACTIVITIES = [
+    fetch_last_message,
+    get_claude_answer_activity,
+    send_message_to_slack,
+    get_messages,
+    check_reactions,
+    resend_message,
+]
+
+
+def parse_queues() -> list:
+    """Return the queues this process serves, from --queues or WORKER_QUEUES (default: all of them)."""
+    parser = argparse.ArgumentParser(description="Run Temporal workers for some or all task queues.")
+    parser.add_argument(
+        "--queues",
+        default=os.getenv("WORKER_QUEUES", ",".join(TASK_QUEUES)),
+        help=f"comma-separated subset of: {', '.join(TASK_QUEUES)}",
+    )
+    queues = [queue.strip() for queue in parser.parse_args().queues.split(",") if queue.strip()]
+    unknown = [queue for queue in queues if queue not in TASK_QUEUES]
+    if unknown or not queues:
+        parser.error(f"unknown queues {unknown}, expected a subset of: {', '.join(TASK_QUEUES)}")
+    # Image keys and text references are written by one activity queue and read by another. The memory
+    # store only resolves them inside this process, so the activity queues must share it unless it's on disk.
+    if set(QUEUE_ACTIVITIES) - set(queues) and IMAGE_STORE_BACKEND != "disk":
+        parser.error(
+            "serving only some of the activity queues needs IMAGE_STORE_BACKEND=disk with IMAGE_STORE_DIR "
+            "on a volume shared by every worker; the memory store would lose images and text references"
+        )
+    return queues
+
+
+async def main():
+    """Connect to Temporal server and run one worker per selected task queue."""
+    queues = parse_queues()
+    client = await Client.connect(
+        os.getenv("TEMPORAL_ADDRESS", "localhost:7233"),
+        data_converter=get_data_converter(),
     )
 
-    print("Worker started")
+    if "telegram" in queues:
+        # Pre-warm the shared Telegram client so the first activity invocation doesn't
+        # pay the auth-key + DC discovery cost on a tight Temporal timeout.
+        try:
+            await get_telegram_client()
+            print("Telegram client connected")
+        except Exception as e:
+            # Non-fatal: the activity will retry. Log and keep going so the worker still serves
+            # other workflows (slack approval) even if Telegram auth is misconfigured.
+            print(f"Telegram client pre-warm failed (will retry on first use): {e}")
+
+        # Forward new channel posts to the monitor workflow as signals instead of waiting for the next poll.
+        if TG_PUSH_INGESTION:
+            try:
+                await start_push_ingestion(client)
+                print("Telegram push ingestion enabled")
+            except Exception as e:
+                # Non-fatal: polling still picks up every message, just with more latency.
+                print(f"Telegram push ingestion failed to start, relying on polling: {e}")
+
+    # Receive reaction_added events so approvals are handled without waiting for the next sweep.
+    if "slack" in queues and SLACK_EVENTS_ENABLED:
+        await start_event_receiver(client)
+        print(f"Slack events receiver listening on port {SLACK_EVENTS_PORT}")
+
+    # Create the shared Claude client and the shared Slack session (with their connection pools)
+    # once for the whole process.
+    if "llm" in queues:
+        await get_claude_client()
+    if "slack" in queues:
+        await get_slack_client()
+        if image_pipeline_missing_dependency():
+            print("IMAGE_DOWNSCALE_ENABLED is set but Pillow is not installed; images will be uploaded unchanged")
+
+    workers = []
+    for queue in queues:
+        if queue == "workflows":
+            workers.append(Worker(
+                client,
+                task_queue=TASK_QUEUES[queue],
+                workflows=[TelegramMonitorWorkflow, TelegramSupervisorWorkflow, TelegramChannelWorkflow, PollSlackForReactionWorkflow],
+                activities=LEGACY_WORKFLOW_QUEUE_ACTIVITIES,
+            ))
+        else:
+            workers.append(Worker(
+                client,
+                task_queue=TASK_QUEUES[queue],
+                activities=QUEUE_ACTIVITIES[queue],
+                **worker_limits(queue),
+            ))
+
+    print(f"Worker started for queues: {', '.join(TASK_QUEUES[queue] for queue in queues)}")
     try:
-        await worker.run()
+        await asyncio.gather(*(worker.run() for worker in workers))
     finally:
+        await stop_event_receiver()
+        stop_push_ingestion()
         await shutdown_telegram_client()
         print("Telegram client disconnected")
+        await shutdown_claude_client()
+        print("Claude client closed")
+        close_translation_cache()
+        print(f"Slack HTTP connection stats: {slack_connection_stats()}")
+        print(f"Image store stats: {image_store_stats()}")
+        print(f"Image downscale stats: {image_pipeline_stats()}")
+        shutdown_image_pipeline()
+        await shutdown_slack_client()
+        print("Slack client closed")
 
 if __name__ == "__main__":
     asyncio.run(main())
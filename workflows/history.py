@@ -0,0 +1,39 @@
+"""
+Continue-as-new helpers shared by the long-running workflows.
+
+Rather than restarting on a wall-clock timer, a workflow continues as new once its history gets
+big, measured the way the server sees it: the server's own suggestion, the event count or the
+history size in bytes, whichever comes first. Quiet runs then live long and cost nothing to
+replay, busy runs rotate before replays and history fetches get expensive.
+"""
+
+from typing import Any, Dict
+
+from temporalio import workflow
+
+# Defaults for the history limits, overridable through a workflow's options dict
+HISTORY_OPTIONS: Dict[str, Any] = {
+    # Continue as new once the history has this many events...
+    "max_history_events": 5000,
+    # ...or is this many bytes
+    "max_history_bytes": 4 * 1024 * 1024,
+}
+
+
+def history_full(options: Dict[str, Any]) -> bool:
+    """Return True if the current run should continue as new."""
+    info = workflow.info()
+    return (
+        info.is_continue_as_new_suggested()
+        or info.get_current_history_length() >= options.get("max_history_events", HISTORY_OPTIONS["max_history_events"])
+        or info.get_current_history_size() >= options.get("max_history_bytes", HISTORY_OPTIONS["max_history_bytes"])
+    )
+
+
+def overrides_only(options: Dict[str, Any], defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the entries of a pollstate options dict that differ from the defaults.
+
+    Only these are carried across continue-as-new. Runs from before that carried the fully
+    merged dict; dropping the entries equal to the defaults turns it back into overrides.
+    """
+    return {name: value for name, value in options.items() if defaults.get(name, object()) != value}
@@ -1,20 +1,170 @@
+import asyncio
 from temporalio import workflow
 from temporalio.common import RetryPolicy
+from temporalio.exceptions import ActivityError, ApplicationError
 from datetime import timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+from workflows.history import HISTORY_OPTIONS, history_full, overrides_only
 
 with workflow.unsafe.imports_passed_through():
-    from activities.slack_approval_activities.get_messages import get_messages
-    from activities.slack_approval_activities.get_reactions import check_reactions
+    from activities.slack_approval_activities.get_messages import get_messages, get_recent_messages
+    from activities.slack_approval_activities.get_reactions import check_reactions, download_slack_image, has_approval
     from activities.slack_approval_activities.resend_message import resend_message
+    from activities.image_store import IMAGE_EVICTED_ERROR
+    from task_queues import TASK_QUEUES
+
+
+# Defaults for the optional fourth pollstate element, a dict of overrides. Only the overrides are
+# carried across continue-as-new, so running workflows pick up changed defaults on their next run.
+DEFAULT_OPTIONS: Dict[str, Any] = {
+    # Minutes between full sweeps of the channel. With the reaction_added event receiver
+    # running, approvals arrive as signals and this is only a slow reconciliation sweep.
+    "poll_minutes": 5,
+    **HISTORY_OPTIONS,
+}
+
+
+# Marks runs that sweep with get_recent_messages. Runs started before it replay the original
+# get_messages/check_reactions loop (activities on the workflow's own task queue) until their
+# next continue-as-new, at most 30 minutes later, and the new run takes the current path.
+BULK_HISTORY_PATCH = "bulk-history"
 
 
 @workflow.defn
 class PollSlackForReactionWorkflow:
 
+    def __init__(self) -> None:
+        self.channel_id: str = ""
+        self.resent: List[str] = []
+        self._approvals: List[str] = []
+
+    @workflow.signal
+    def approve(self, update: List[str]) -> None:
+        """Signal from the events receiver: `update` is [channel_id, ts] of a newly approved message."""
+        channel_id, ts = update[0], update[1]
+        if channel_id == self.channel_id and ts not in self.resent and ts not in self._approvals:
+            self._approvals.append(ts)
+
     @workflow.run
     async def run(self, pollstate):
         """Poll Slack for approved messages and resend them to the news channel."""
+        if not workflow.patched(BULK_HISTORY_PATCH):
+            await self._run_per_message(pollstate)
+            return
+
+        self.channel_id = pollstate[0]
+        self.resent = pollstate[1]
+        overrides = overrides_only(pollstate[3] if len(pollstate) > 3 else {}, DEFAULT_OPTIONS)
+        options = {**DEFAULT_OPTIONS, **overrides}
+        channel_id = self.channel_id
+
+        while True:
+            # One bulk call returns text, reactions and files for every recent message
+            messages = await workflow.execute_activity(
+                get_recent_messages,
+                channel_id,
+                task_queue=TASK_QUEUES["slack"],
+                schedule_to_close_timeout=timedelta(seconds=60),
+                retry_policy=RetryPolicy(maximum_attempts=5),
+            )
+
+            for info in messages:
+                await self._resend_if_approved(info)
+
+            workflow.logger.info(f"Checked {len(messages)} messages")
+
+            # Continue as new once the history gets big
+            if history_full(options):
+                await workflow.continue_as_new(
+                    [channel_id,
+                    self.resent,
+                    workflow.now().timestamp(),
+                    overrides]
+                )
+
+            # Sleep until the next sweep, handling approval signals as they arrive
+            next_sweep = workflow.now() + timedelta(minutes=options["poll_minutes"])
+            while workflow.now() < next_sweep:
+                try:
+                    await workflow.wait_condition(
+                        lambda: bool(self._approvals),
+                        timeout=next_sweep - workflow.now(),
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+                while self._approvals:
+                    ts = self._approvals.pop(0)
+                    approved = await workflow.execute_activity(
+                        get_recent_messages,
+                        args=[channel_id, 1, ts],
+                        task_queue=TASK_QUEUES["slack"],
+                        schedule_to_close_timeout=timedelta(seconds=60),
+                        retry_policy=RetryPolicy(maximum_attempts=5),
+                    )
+                    for info in approved:
+                        await self._resend_if_approved(info)
+
+    async def _resend_if_approved(self, info: Dict[str, Any]) -> None:
+        """Resend a message to the news channel if it is approved and was not resent yet."""
+        ts = info["ts"]
+        if ts in self.resent or not has_approval(info):
+            return
+
+        # Only approved messages have their image downloaded
+        has_url = bool(info.get("has_image") and info.get("image_url"))
+        image_key = await self._download_image(info) if has_url else None
+
+        try:
+            await self._resend(info, image_key)
+        except ActivityError as e:
+            # The image store dropped the image before the resend; download it once more
+            if not (has_url and isinstance(e.cause, ApplicationError) and e.cause.type == IMAGE_EVICTED_ERROR):
+                raise
+            workflow.logger.warning(f"Image for message {ts} was evicted, downloading it again")
+            await self._resend(info, await self._download_image(info))
+
+        self.resent.append(ts)
+
+        if len(self.resent) > 50:
+            self.resent = self.resent[-20:]
+
+        workflow.logger.info(f"Resent approved message {ts}")
+
+    async def _download_image(self, info: Dict[str, Any]) -> Optional[str]:
+        """Download a message's image into the image store and return its key."""
+        return await workflow.execute_activity(
+            download_slack_image,
+            [info["image_url"], info["ts"]],
+            task_queue=TASK_QUEUES["slack"],
+            schedule_to_close_timeout=timedelta(seconds=60),
+            retry_policy=RetryPolicy(maximum_attempts=5),
+        )
+
+    async def _resend(self, info: Dict[str, Any], image_key: Optional[str]) -> None:
+        """Resend a message, with its image if it has one, to the news channel."""
+        # Prepare message info with image data if available
+        message_info = {
+            "text": info["text"],
+            "has_image": info.get("has_image", False),
+            "image_data": image_key
+        }
+
+        await workflow.execute_activity(
+            resend_message,
+            message_info,
+            task_queue=TASK_QUEUES["slack"],
+            schedule_to_close_timeout=timedelta(seconds=60),
+            retry_policy=RetryPolicy(maximum_attempts=5),
+        )
+
+    async def _run_per_message(self, pollstate) -> None:
+        """The loop from before the bulk sweep, one check_reactions activity per message.
+
+        Kept unchanged so runs started on it replay deterministically. It continues as new with
+        a pollstate the current loop accepts.
+        """
         channel_id = pollstate[0]
         resent = pollstate[1]
         started_at = pollstate[2]
@@ -38,19 +188,13 @@ class PollSlackForReactionWorkflow:
                     retry_policy=RetryPolicy(maximum_attempts=5),
                 )
 
-                has_checkmark = any(
-                    r.get("name") == "white_check_mark"
-                    for r in info.get("reactions", [])
-                )
-
-                if has_checkmark:
-                    # Prepare message info with image data if available
+                if has_approval(info):
                     message_info = {
                         "text": info["text"],
                         "has_image": info.get("has_image", False),
                         "image_data": info.get("image_data")
                     }
-                    
+
                     await workflow.execute_activity(
                         resend_message,
                         message_info,
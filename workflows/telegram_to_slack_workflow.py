@@ -1,20 +1,357 @@
+import asyncio
 from datetime import timedelta
 from temporalio import workflow
 from temporalio.common import RetryPolicy
+from temporalio.exceptions import ActivityError, ApplicationError, ChildWorkflowError, WorkflowAlreadyStartedError
 from typing import Dict, List, Any, Optional
 
+from workflows.history import HISTORY_OPTIONS, history_full, overrides_only
+
 with workflow.unsafe.imports_passed_through():
-    from activities.telegram_to_slack_activities.telegram_get_messeges import fetch_last_message
-    from activities.telegram_to_slack_activities.claude_translate import get_claude_answer_activity
+    from activities.telegram_to_slack_activities.telegram_get_messeges import (
+        download_telegram_media,
+        fetch_last_message,
+    )
+    from activities.telegram_to_slack_activities.claude_translate import (
+        get_claude_answer_activity,
+        get_claude_answers_batch_activity,
+    )
     from activities.telegram_to_slack_activities.send_message_to_slack import send_message_to_slack
+    from activities.image_store import IMAGE_EVICTED_ERROR
+    from task_queues import TASK_QUEUES
+
+
+# Defaults for the optional fourth pollstate element, a dict of overrides. Only the overrides are
+# carried across continue-as-new, so running workflows pick up changed defaults on their next run.
+DEFAULT_OPTIONS: Dict[str, Any] = {
+    # Messages fetched per poll. A poll that fills it is followed straight away by another, so a
+    # backlog is drained oldest first
+    "fetch_limit": 5,
+    # Use the batched translation activity when more than this many new messages are pending in a channel
+    "batch_threshold": 2,
+    # Messages per batched translation activity; a longer backlog is split into several batches
+    "batch_size": 3,
+    # Maximum number of channels polled at the same time
+    "channel_fanout": 5,
+    # Translations (single messages or batches) kept running ahead of the Slack posts within a
+    # channel; 1 processes strictly one at a time
+    "pipeline_depth": 2,
+    # Minutes between polls of a channel (the starting point when adaptive polling is on). With
+    # push ingestion enabled this is only the gap-filling fallback, so it can be raised well above
+    # the default.
+    "poll_interval_minutes": 3,
+    # Adapt each channel's interval to its recent post rate, between the two bounds below
+    "adaptive_polling": True,
+    "min_poll_minutes": 1,
+    "max_poll_minutes": 30,
+    # Weight of the latest poll in a channel's smoothed post rate
+    "rate_smoothing": 0.3,
+    # Seconds TelegramSupervisorWorkflow waits before restarting a failed channel workflow
+    "restart_delay_seconds": 60,
+    # Minutes between a channel workflow's progress checkpoints with its supervisor. A child that
+    # dies is restarted from its last checkpoint, so it may repost up to this much.
+    "checkpoint_minutes": 5,
+    # Minutes between checks that a channel workflow carried over from the supervisor's previous
+    # run is still running
+    "child_check_minutes": 10,
+    # Keep message texts and translations in the local text store and pass only references
+    # through workflow history
+    "bodies_by_reference": False,
+    **HISTORY_OPTIONS,
+}
+
+
+# Marks monitor runs that use the channel pipeline (concurrent polls, batching, deferred media,
+# signals and per-purpose task queues). Runs started before it replay the original sequential
+# loop, with its activities on the workflow's own task queue, until their next continue-as-new
+# at most 15 minutes later; the new run takes the current path.
+CHANNEL_PIPELINE_PATCH = "channel-pipeline"
+
+
+def channel_workflow_id(supervisor_id: str, channel: str) -> str:
+    """Return the workflow id of the TelegramChannelWorkflow a supervisor runs for a channel."""
+    return f"{supervisor_id}-{channel.lstrip('@').lower()}"
+
+
+class _ChannelPipeline:
+    """Fetch, translate and forward steps for one channel, shared by the monitor and channel workflows."""
+
+    def __init__(self) -> None:
+        self.last_ids: Dict[str, int] = {}
+        self.overrides: Dict[str, Any] = {}
+        self.options: Dict[str, Any] = dict(DEFAULT_OPTIONS)
+        # channel -> {"interval": minutes, "rate": posts per minute, "polled_at": timestamp,
+        #             "window_start": timestamp, "window_posts": posts counted since window_start}
+        self.schedule: Dict[str, Dict[str, Any]] = {}
+
+    def _next_due(self, channel: str) -> float:
+        """Return the timestamp at which a channel is due for its next poll."""
+        entry = self.schedule.get(channel)
+        if not entry or entry.get("polled_at") is None:
+            return 0.0
+        return entry["polled_at"] + entry["interval"] * 60
+
+    def _record_poll(self, channel: str, new_messages: int) -> None:
+        """Update a channel's smoothed post rate and derive its next poll interval from it.
+
+        The interval aims at about one new post per poll: a channel posting every 5 minutes is
+        polled every 5 minutes, a silent one drifts out to max_poll_minutes. Posts are counted
+        over a window of at least the current interval, so the quick re-polls after a full fetch
+        or a push signal add to the count instead of becoming samples of their own. The rate
+        starts from poll_interval_minutes, and one update moves the interval by at most 2x.
+        """
+        now = workflow.now().timestamp()
+        entry = self.schedule.setdefault(
+            channel, {"interval": self.options["poll_interval_minutes"], "rate": None, "polled_at": None}
+        )
+        if entry["polled_at"] is None:
+            # The first poll returns recent history rather than new posts; start counting from here
+            entry["window_start"], entry["window_posts"] = now, 0
+        elif self.options["adaptive_polling"]:
+            window_start = entry.setdefault("window_start", entry["polled_at"])
+            entry["window_posts"] = entry.get("window_posts", 0) + new_messages
+            elapsed_minutes = (now - window_start) / 60
+            if elapsed_minutes >= entry["interval"]:
+                sample = entry["window_posts"] / elapsed_minutes
+                previous = entry["rate"] if entry["rate"] is not None else 1 / self.options["poll_interval_minutes"]
+                smoothing = self.options["rate_smoothing"]
+                rate = smoothing * sample + (1 - smoothing) * previous
+                interval = 1 / rate if rate > 0 else self.options["max_poll_minutes"]
+                interval = min(max(interval, entry["interval"] / 2), entry["interval"] * 2)
+                entry["rate"] = rate
+                entry["interval"] = min(max(interval, self.options["min_poll_minutes"]), self.options["max_poll_minutes"])
+                entry["window_start"], entry["window_posts"] = now, 0
+        entry["polled_at"] = now
+
+    async def _poll_channel(self, channel: str) -> int:
+        """Fetch new messages from one channel, then validate, translate and forward them in order.
+
+        Returns the number of new messages fetched.
+        """
+        last_saved_id = self.last_ids.get(channel, 0)
+
+        # Fetch messages newer than the last processed one (returns list in chronological order: oldest to newest)
+        messages = await workflow.execute_activity(
+            fetch_last_message,
+            args=[channel, self.options["fetch_limit"], last_saved_id, self.options["bodies_by_reference"]],
+            task_queue=TASK_QUEUES["telegram"],
+            start_to_close_timeout=timedelta(minutes=5),
+            heartbeat_timeout=timedelta(seconds=45),
+            retry_policy=RetryPolicy(
+                maximum_attempts=5,
+                initial_interval=timedelta(seconds=2),
+                maximum_interval=timedelta(seconds=30),
+            ),
+        )
+
+        if not messages:
+            workflow.logger.info(f"No new messages found in channel {channel}")
+            return 0
+
+        workflow.logger.info(f"Processing {len(messages)} messages from {channel}")
+
+        # Keep only new, non-empty messages (still in chronological order: oldest to newest)
+        pending = [
+            last_msg for last_msg in messages
+            if last_msg
+            and (len(last_msg["text"]) > 0 or last_msg.get("has_image", False))
+            and last_msg["id"] > last_saved_id
+        ]
+
+        # A busy channel's backlog is translated in batches of batch_size instead of one call per
+        # message. Either way, with pipeline_depth > 1 the next translations run while the current
+        # messages are posted; posts and last_ids still advance strictly in msg_id order.
+        batched = len(pending) > self.options["batch_threshold"]
+        unit_size = max(1, self.options["batch_size"]) if batched else 1
+        unit_count = -(-len(pending) // unit_size)
+        depth = max(1, self.options["pipeline_depth"])
+        translations: Dict[int, Any] = {}
+        try:
+            for index, last_msg in enumerate(pending):
+                msg_id = last_msg["id"]
+
+                unit = index // unit_size
+                for ahead in range(unit, min(unit + depth, unit_count)):
+                    if ahead not in translations:
+                        texts = [ahead_msg["text"] for ahead_msg in pending[ahead * unit_size:(ahead + 1) * unit_size]]
+                        translations[ahead] = self._start_batch_translation(texts) if batched else self._start_translation(texts[0])
+                translated = await translations[unit]
+                if batched:
+                    translated = translated[index % unit_size]
+
+                # If translated is empty, the message was filtered out as inappropriate or off-topic
+                if translated and translated.strip():
+                    # Photos are only downloaded once the message has been approved
+                    image_key = last_msg.get("image_data")
+                    if last_msg.get("media") and not image_key:
+                        image_key = await self._download_media(last_msg["media"])
+
+                    try:
+                        await self._send_to_slack(translated, channel, last_msg, image_key)
+                    except ActivityError as e:
+                        # The image store dropped the photo before the post; download it once more
+                        if not (last_msg.get("media") and _image_evicted(e)):
+                            raise
+                        workflow.logger.warning(f"Image for {channel} ID={msg_id} was evicted, downloading it again")
+                        image_key = await self._download_media(last_msg["media"])
+                        await self._send_to_slack(translated, channel, last_msg, image_key)
+
+                    workflow.logger.info(
+                        f"Sent new message from {channel}: ID={msg_id}"
+                    )
+                else:
+                    workflow.logger.info(
+                        f"Message from {channel} (ID={msg_id}) was filtered out as inappropriate or off-topic"
+                    )
+
+                # Update last_ids only once the message has finished every stage
+                self.last_ids[channel] = msg_id
+
+            # Skip past fetched messages with nothing to post, so the next poll starts after them
+            self.last_ids[channel] = max(self.last_ids.get(channel, 0), messages[-1]["id"])
+        finally:
+            # A failed post leaves later messages for the next cycle; drop their running translations
+            for handle in translations.values():
+                handle.cancel()
+
+        return len(messages)
+
+    async def _download_media(self, media: Dict[str, Any]) -> Optional[str]:
+        """Download a message's photo into the image store and return its key."""
+        return await workflow.execute_activity(
+            download_telegram_media,
+            media,
+            task_queue=TASK_QUEUES["telegram"],
+            start_to_close_timeout=timedelta(minutes=5),
+            heartbeat_timeout=timedelta(seconds=45),
+            retry_policy=RetryPolicy(
+                maximum_attempts=5,
+                initial_interval=timedelta(seconds=2),
+                maximum_interval=timedelta(seconds=30),
+            ),
+        )
+
+    async def _send_to_slack(self, translated: str, channel: str, last_msg: Dict[str, Any], image_key: Optional[str]) -> None:
+        """Post a translated message, with its image if it has one, to Slack."""
+        await workflow.execute_activity(
+            send_message_to_slack,
+            [translated, channel, last_msg.get("has_image", False), image_key, last_msg["id"], last_msg["text"]],
+            task_queue=TASK_QUEUES["slack"],
+            schedule_to_close_timeout=timedelta(seconds=30),
+            retry_policy=RetryPolicy(maximum_attempts=5),
+        )
+
+    def _start_translation(self, text: str):
+        """Start the translation activity for one message and return its handle."""
+        return workflow.start_activity(
+            get_claude_answer_activity,
+            text,
+            task_queue=TASK_QUEUES["llm"],
+            schedule_to_close_timeout=timedelta(seconds=180),
+            retry_policy=RetryPolicy(maximum_attempts=5),
+        )
+
+    def _start_batch_translation(self, texts: List[str]):
+        """Start the batched translation activity for several messages and return its handle."""
+        return workflow.start_activity(
+            get_claude_answers_batch_activity,
+            texts,
+            task_queue=TASK_QUEUES["llm"],
+            schedule_to_close_timeout=timedelta(seconds=300),
+            retry_policy=RetryPolicy(maximum_attempts=5),
+        )
+
 
 
 @workflow.defn
-class TelegramMonitorWorkflow:
+class TelegramMonitorWorkflow(_ChannelPipeline):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._in_flight: set = set()
+        self._tasks: set = set()
+        self._fanout: Optional[asyncio.Semaphore] = None
+        self._channel_list: List[str] = []
+        self._woken: set = set()
+        self._finished = False
+
+    @workflow.signal
+    def new_message(self, update: List[Any]) -> None:
+        """Signal from push ingestion: `update` is [channel, msg_id] for a freshly posted message."""
+        channel_name, msg_id = str(update[0]).lstrip("@").lower(), update[1]
+        for channel in self._channel_list:
+            if channel.lstrip("@").lower() == channel_name and msg_id > self.last_ids.get(channel, 0):
+                self._woken.add(channel)
 
     @workflow.run
     async def run(self, pollstate):
         """Poll Telegram channels, validate and translate messages, then forward to Slack."""
+        if not workflow.patched(CHANNEL_PIPELINE_PATCH):
+            await self._run_sequential(pollstate)
+            return
+
+        channel_list = pollstate[0]
+        self._channel_list = channel_list
+        self.last_ids = pollstate[1]
+        self.overrides = overrides_only(pollstate[3] if len(pollstate) > 3 else {}, DEFAULT_OPTIONS)
+        self.options = {**DEFAULT_OPTIONS, **self.overrides}
+        self.schedule = pollstate[4] if len(pollstate) > 4 else {}
+        self._fanout = asyncio.Semaphore(self.options["channel_fanout"])
+
+        while True:
+            # Poll every channel whose own interval has run out, plus channels woken by a
+            # new_message signal
+            self._finished = False
+            now = workflow.now().timestamp()
+            targets = [
+                channel for channel in channel_list
+                if channel in self._woken or self._next_due(channel) <= now
+            ]
+
+            # Start every idle target; a channel still busy from an earlier poll is skipped so one
+            # slow channel never delays the others. A woken busy channel stays woken and is
+            # polled again as soon as it finishes.
+            for channel in targets:
+                if channel in self._in_flight:
+                    workflow.logger.info(f"Channel {channel} is still being processed, skipping this cycle")
+                    continue
+                self._woken.discard(channel)
+                self._in_flight.add(channel)
+                task = asyncio.create_task(self._poll_channel_task(channel))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            # Continue as new once the history gets big. This resets the workflow history while
+            # preserving state
+            if history_full(self.options):
+                # Let in-flight channels finish so their last_ids are carried over
+                await workflow.wait_condition(lambda: not self._in_flight)
+                await workflow.continue_as_new(
+                    [channel_list,
+                    self.last_ids,
+                    workflow.now().timestamp(),
+                    self.overrides,
+                    self.schedule],
+                )
+
+            # Sleep until the next idle channel is due, a signal wakes an idle channel, or a
+            # running poll finishes and schedules its channel's next poll
+            idle_due = [self._next_due(channel) for channel in channel_list if channel not in self._in_flight]
+            timeout = min(idle_due) - workflow.now().timestamp() if idle_due else self.options["max_poll_minutes"] * 60
+            try:
+                await workflow.wait_condition(
+                    lambda: self._finished or any(channel not in self._in_flight for channel in self._woken),
+                    timeout=timedelta(seconds=max(timeout, 1)),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_sequential(self, pollstate) -> None:
+        """The loop from before the channel pipeline, one channel and one message at a time.
+
+        Kept unchanged so runs started on it replay deterministically. It continues as new with
+        a pollstate the current loop accepts.
+        """
         channel_list = pollstate[0]
         last_ids = pollstate[1]
         started_at = pollstate[2]
@@ -23,7 +360,6 @@ class TelegramMonitorWorkflow:
             for channel in channel_list:
                 last_saved_id = last_ids.get(channel, 0)
 
-                # Fetch last few messages (returns list in chronological order: oldest to newest)
                 messages = await workflow.execute_activity(
                     fetch_last_message,
                     channel,
@@ -40,17 +376,11 @@ class TelegramMonitorWorkflow:
                     workflow.logger.info(f"No messages found in channel {channel}")
                     continue
 
-                workflow.logger.info(f"Processing {len(messages)} messages from {channel}")
-
-                # Process messages in chronological order (oldest to newest)
                 for last_msg in messages:
-                    # Skip empty messages
                     if not last_msg or (len(last_msg["text"]) == 0 and not last_msg.get("has_image", False)):
                         continue
 
                     msg_id = last_msg["id"]
-
-                    # Skip messages that have already been processed
                     if msg_id <= last_saved_id:
                         continue
 
@@ -61,28 +391,22 @@ class TelegramMonitorWorkflow:
                         retry_policy=RetryPolicy(maximum_attempts=5),
                     )
 
-                    # If translated is empty, the message was filtered out as inappropriate or off-topic
                     if translated and translated.strip():
+                        # Photos are no longer fetched with the message, so these posts go out as text
                         await workflow.execute_activity(
                             send_message_to_slack,
                             [translated, channel, last_msg.get("has_image", False), last_msg.get("image_data"), msg_id, last_msg["text"]],
                             schedule_to_close_timeout=timedelta(seconds=30),
                             retry_policy=RetryPolicy(maximum_attempts=5),
                         )
-
-                        workflow.logger.info(
-                            f"Sent new message from {channel}: ID={msg_id}"
-                        )
+                        workflow.logger.info(f"Sent new message from {channel}: ID={msg_id}")
                     else:
                         workflow.logger.info(
                             f"Message from {channel} (ID={msg_id}) was filtered out as inappropriate or off-topic"
                         )
 
-                    # Update last_ids after processing each message
                     last_ids[channel] = msg_id
 
-            # Continue as new after 15 minutes to prevent history size from exceeding limit
-            # This resets the workflow history while preserving state
             if workflow.now().timestamp() - started_at >= 15 * 60:
                 await workflow.continue_as_new(
                     [channel_list,
@@ -91,3 +415,279 @@ class TelegramMonitorWorkflow:
                 )
 
             await workflow.sleep(timedelta(minutes=3))
+
+    async def _poll_channel_task(self, channel: str) -> None:
+        """Poll one channel under the fan-out limit, keeping failures local to that channel."""
+        new_messages = 0
+        try:
+            async with self._fanout:
+                new_messages = await self._poll_channel(channel)
+        except ActivityError as e:
+            # Activities already retried; try this channel again on the next cycle
+            workflow.logger.error(f"Polling channel {channel} failed: {e}")
+        finally:
+            self._record_poll(channel, new_messages)
+            if new_messages >= self.options["fetch_limit"]:
+                # The fetch was full, so more messages may be waiting; poll again right away
+                self._woken.add(channel)
+            self._in_flight.discard(channel)
+            self._finished = True
+
+
+@workflow.defn
+class TelegramChannelWorkflow(_ChannelPipeline):
+    """Polls a single channel; started and restarted by TelegramSupervisorWorkflow."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.channel: str = ""
+        self._woken = False
+        self._stopping = False
+        self._reported_id = 0
+        self._reported_at = 0.0
+
+    @workflow.signal
+    def new_message(self, update: List[Any]) -> None:
+        """Signal from push ingestion: `update` is [channel, msg_id] for a freshly posted message."""
+        if update[1] > self.last_ids.get(self.channel, 0):
+            self._woken = True
+
+    @workflow.signal
+    def stop(self) -> None:
+        """Finish the current poll and return the last processed message id."""
+        self._stopping = True
+
+    @workflow.run
+    async def run(self, pollstate) -> int:
+        """Poll one channel until stopped. `pollstate` is [channel, last_id, started_at, options, schedule]."""
+        channel = self.channel = pollstate[0]
+        self.last_ids = {channel: pollstate[1]}
+        self.overrides = overrides_only(pollstate[3] if len(pollstate) > 3 else {}, DEFAULT_OPTIONS)
+        self.options = {**DEFAULT_OPTIONS, **self.overrides}
+        self.schedule = pollstate[4] if len(pollstate) > 4 else {}
+        self._reported_id = pollstate[1]
+        self._reported_at = workflow.now().timestamp()
+
+        while not self._stopping:
+            self._woken = False
+            new_messages = 0
+            try:
+                new_messages = await self._poll_channel(channel)
+            except ActivityError as e:
+                # Activities already retried; try again on the next cycle
+                workflow.logger.error(f"Polling channel {channel} failed: {e}")
+            self._record_poll(channel, new_messages)
+            if new_messages >= self.options["fetch_limit"]:
+                # The fetch was full, so more messages may be waiting; poll again right away
+                self._woken = True
+
+            # Checkpoint with the supervisor every checkpoint_minutes rather than after every poll,
+            # so busy channels don't fill its history
+            rollover = history_full(self.options) and not self._stopping
+            due = workflow.now().timestamp() - self._reported_at >= self.options["checkpoint_minutes"] * 60
+            if (due or rollover) and not await self._checkpoint():
+                break
+
+            # Continue as new once the history gets big
+            if rollover:
+                await workflow.continue_as_new(
+                    [channel, self.last_ids.get(channel, 0), workflow.now().timestamp(), self.overrides, self.schedule]
+                )
+
+            # Sleep until the next poll is due, a push notification or a stop request
+            try:
+                await workflow.wait_condition(
+                    lambda: self._woken or self._stopping,
+                    timeout=timedelta(minutes=self.schedule[channel]["interval"]),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+        if self._stopping:
+            await self._checkpoint()
+        return self.last_ids.get(channel, 0)
+
+    async def _checkpoint(self) -> bool:
+        """Report the last processed id and poll schedule to the supervisor, so a restarted child
+        resumes from here.
+
+        Returns False if the supervisor is gone, in which case this child should stop.
+        """
+        last_id = self.last_ids.get(self.channel, 0)
+        parent = workflow.info().parent
+        if parent is None or last_id == self._reported_id:
+            return True
+        try:
+            await workflow.get_external_workflow_handle(parent.workflow_id).signal(
+                TelegramSupervisorWorkflow.channel_progress, [self.channel, last_id, self.schedule.get(self.channel)]
+            )
+        except ApplicationError as e:
+            # Nothing would restart or stop this child any more
+            workflow.logger.warning(f"Supervisor of channel {self.channel} is unreachable, stopping: {e}")
+            return False
+        self._reported_id, self._reported_at = last_id, workflow.now().timestamp()
+        return True
+
+
+@workflow.defn
+class TelegramSupervisorWorkflow:
+    """Runs one TelegramChannelWorkflow per channel, so channels poll independently and spread across workers.
+
+    Channels are added and removed at runtime with the add_channel / remove_channel signals.
+    Children checkpoint their last processed id and poll schedule through channel_progress; a
+    failed child is restarted from that checkpoint after `restart_delay_seconds`.
+
+    Children keep running when the supervisor continues as new. The new run cannot await them,
+    so it adopts them instead: starting a child whose workflow id is still running fails, and the
+    supervisor retries every `child_check_minutes` to restart the child once it is gone.
+    """
+
+    def __init__(self) -> None:
+        self.channels: List[str] = []
+        self.last_ids: Dict[str, int] = {}
+        self.overrides: Dict[str, Any] = {}
+        self.options: Dict[str, Any] = dict(DEFAULT_OPTIONS)
+        # channel -> the last poll schedule entry its child checkpointed
+        self.schedules: Dict[str, Dict[str, Any]] = {}
+        self._children: Dict[str, Any] = {}
+        # Channels whose child was started by a previous run and is still running
+        self._adopted: set = set()
+        self._generation: Dict[str, int] = {}
+        self._restart_at: Dict[str, float] = {}
+        self._stopping: set = set()
+        self._tasks: set = set()
+        self._changed = False
+
+    @workflow.signal
+    def add_channel(self, channel: str) -> None:
+        """Start monitoring a channel."""
+        if channel not in self.channels:
+            self.channels.append(channel)
+        self._restart_at.pop(channel, None)
+        self._changed = True
+
+    @workflow.signal
+    def remove_channel(self, channel: str) -> None:
+        """Stop monitoring a channel once its child finishes the current poll."""
+        if channel in self.channels:
+            self.channels.remove(channel)
+        self._changed = True
+
+    @workflow.signal
+    def channel_progress(self, update: List[Any]) -> None:
+        """Checkpoint from a child: `update` is [channel, last_id, schedule entry]."""
+        channel, last_id = update[0], update[1]
+        if last_id > self.last_ids.get(channel, 0):
+            self.last_ids[channel] = last_id
+        if len(update) > 2 and update[2]:
+            self.schedules[channel] = update[2]
+
+    @workflow.run
+    async def run(self, pollstate):
+        """Keep one child workflow running per channel.
+
+        `pollstate` is [channel_list, last_ids, started_at, options, schedules].
+        """
+        self.channels = list(pollstate[0])
+        self.last_ids = pollstate[1]
+        self.overrides = overrides_only(pollstate[3] if len(pollstate) > 3 else {}, DEFAULT_OPTIONS)
+        self.options = {**DEFAULT_OPTIONS, **self.overrides}
+        self.schedules = pollstate[4] if len(pollstate) > 4 else {}
+
+        while True:
+            self._changed = False
+            now = workflow.now().timestamp()
+
+            for channel in self.channels:
+                if channel not in self._children and self._restart_at.get(channel, 0) <= now:
+                    await self._start_child(channel)
+
+            for channel, handle in list(self._children.items()):
+                if channel not in self.channels and channel not in self._stopping:
+                    self._stopping.add(channel)
+                    await handle.signal(TelegramChannelWorkflow.stop)
+
+            for channel in list(self._adopted):
+                if channel not in self.channels:
+                    # The child sends a final checkpoint as it stops
+                    self._adopted.discard(channel)
+                    self._restart_at.pop(channel, None)
+                    try:
+                        await workflow.get_external_workflow_handle(
+                            channel_workflow_id(workflow.info().workflow_id, channel)
+                        ).signal(TelegramChannelWorkflow.stop)
+                    except ApplicationError as e:
+                        workflow.logger.info(f"Workflow for removed channel {channel} already finished: {e}")
+
+            # Continue as new once the history gets big. Children keep running and the new run
+            # adopts them; their checkpoints and schedules are carried over for later restarts.
+            if history_full(self.options):
+                await workflow.continue_as_new(
+                    [self.channels,
+                    self.last_ids,
+                    workflow.now().timestamp(),
+                    self.overrides,
+                    self.schedules],
+                )
+
+            # Sleep until a signal or a finished child needs attention, a restart is due, or
+            # progress signals have filled the history
+            due = [at for channel, at in self._restart_at.items() if channel in self.channels and channel not in self._children]
+            timeout = timedelta(seconds=max(min(due) - now, 1)) if due else None
+            try:
+                await workflow.wait_condition(
+                    lambda: self._changed or history_full(self.options),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _start_child(self, channel: str) -> None:
+        """Start the channel workflow for a channel and watch it until it finishes."""
+        generation = self._generation.get(channel, 0) + 1
+        self._generation[channel] = generation
+        schedule = {channel: self.schedules[channel]} if channel in self.schedules else {}
+        try:
+            handle = await workflow.start_child_workflow(
+                TelegramChannelWorkflow.run,
+                [channel, self.last_ids.get(channel, 0), workflow.now().timestamp(), self.overrides, schedule],
+                id=channel_workflow_id(workflow.info().workflow_id, channel),
+                # Keep children running while the supervisor continues as new
+                parent_close_policy=workflow.ParentClosePolicy.ABANDON,
+            )
+        except WorkflowAlreadyStartedError:
+            # Started by a previous run and still running; check on it again later
+            self._adopted.add(channel)
+            self._restart_at[channel] = workflow.now().timestamp() + self.options["child_check_minutes"] * 60
+            return
+        except Exception as e:
+            workflow.logger.error(f"Starting the workflow for channel {channel} failed: {e}")
+            self._restart_at[channel] = workflow.now().timestamp() + self.options["restart_delay_seconds"]
+            return
+
+        self._restart_at.pop(channel, None)
+        self._adopted.discard(channel)
+        self._children[channel] = handle
+        task = asyncio.create_task(self._watch_child(channel, handle, generation))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _watch_child(self, channel: str, handle, generation: int) -> None:
+        """Wait for a child to finish, recording its last_id or scheduling its restart."""
+        try:
+            last_id = await handle
+            if last_id > self.last_ids.get(channel, 0):
+                self.last_ids[channel] = last_id
+        except ChildWorkflowError as e:
+            workflow.logger.error(f"Workflow for channel {channel} failed, restarting it: {e}")
+            self._restart_at[channel] = workflow.now().timestamp() + self.options["restart_delay_seconds"]
+        finally:
+            if self._generation.get(channel) == generation:
+                self._children.pop(channel, None)
+                self._stopping.discard(channel)
+            self._changed = True
+
+
+def _image_evicted(error: ActivityError) -> bool:
+    """Return True if an activity failed because its image was evicted from the image store."""
+    return isinstance(error.cause, ApplicationError) and error.cause.type == IMAGE_EVICTED_ERROR